@@ -0,0 +1,428 @@
+import calendar
+import datetime
+import threading
+
+import numpy as np
+from mysql.connector import Error
+
+from columnar import ColumnarResult
+from fast_path import Freshness, fast_path, load_unless_changed
+from olap_cube import ROAD_NAMES_QUERY
+from row_types import make_rows
+
+# One row per (day, road, severity) combination that has accidents
+LOAD_QUERY = """
+    SELECT Date, RoadID, Severity, COUNT(*)
+    FROM accident
+    WHERE Date IS NOT NULL
+    GROUP BY Date, RoadID, Severity;
+"""
+
+GRANULARITIES = ("day", "week", "month", "year")
+
+# accident columns the cube is keyed by; writes touching anything else leave it alone
+CUBE_COLUMNS = ("Date", "RoadID", "Severity")
+
+# Longest stretch of days the dense day axis may cover (about ten years)
+DEFAULT_MAX_DAYS = 3660
+
+SERIES_COLUMNS = ("Period", "AccidentCount")
+
+RUNNING_TOTAL_COLUMNS = ("RoadName", "Date", "DailyAccidents", "RunningTotal")
+
+# SQL expression for each granularity's period label, matching the cube's labels
+PERIOD_SQL = {
+    "day": "CAST(Date AS CHAR)",
+    "week": "CAST(DATE_SUB(Date, INTERVAL WEEKDAY(Date) DAY) AS CHAR)",
+    "month": "CONCAT(YEAR(Date), '-', LPAD(MONTH(Date), 2, '0'))",
+    "year": "CAST(YEAR(Date) AS CHAR)",
+}
+
+
+def series_sql(granularity, start=None, end=None, road_id=None, severity=None):
+    """``(query, params)`` for the accident series GROUP BY, with the filters that are set."""
+    conditions, params = ["Date IS NOT NULL"], []
+    for condition, value in (("Date >= %s", start), ("Date <= %s", end),
+                             ("RoadID = %s", road_id), ("Severity = %s", severity)):
+        if value is not None:
+            conditions.append(condition)
+            params.append(value)
+    query = (f"SELECT {PERIOD_SQL[granularity]} AS Period, COUNT(*) AS AccidentCount FROM accident "
+             f"WHERE {' AND '.join(conditions)} GROUP BY Period ORDER BY Period;")
+    return query, tuple(params)
+
+
+def parse_date(value):
+    """A date filter (None, a date or an ISO 'YYYY-MM-DD' string) as a date; ValueError if it is not one."""
+    if value is None or isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD.") from None
+
+
+def _day(value):
+    """A DATE column value (date, datetime or 'YYYY-MM-DD' string) as a numpy day."""
+    if isinstance(value, str):
+        value = parse_date(value)
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return np.datetime64(value, "D")
+
+
+def period_keys(days, granularity):
+    """The period each day falls in: the day itself, its week's Monday, its month or its year."""
+    if granularity == "day":
+        return days
+    if granularity == "week":
+        # 1970-01-01 was a Thursday, three days after a Monday
+        return days - (days.astype(np.int64) + 3) % 7
+    if granularity == "month":
+        return days.astype("datetime64[M]")
+    if granularity == "year":
+        return days.astype("datetime64[Y]")
+    raise ValueError(f"Unknown granularity '{granularity}', expected one of {', '.join(GRANULARITIES)}.")
+
+
+class DailyAccidentCube:
+    """
+    Accident counts per day, road and severity, kept in memory.
+
+    ``counts[day, road, severity]`` is a dense int32 array whose first axis
+    covers every day from the earliest to the latest accident, up to
+    ``max_days`` days: beyond that the axis keeps the stretch with the most
+    accidents, and the dates outside it (typically typos like 0001-01-01)
+    are only counted per day, so that queries whose date range reaches them
+    go to SQL (the ``*_result`` methods return None). Daily, weekly,
+    monthly and yearly series, with optional date, road and severity
+    filters, are slices and ``np.add.reduceat`` over that array instead of a
+    GROUP BY over the whole accident table.
+
+    ``cumulative[day, road]`` holds each road's running total (accidents up
+    to and including the day), so a road's accidents over any date range are
+    the difference of two entries.
+
+    DatabaseManager applies accident inserts, updates and deletes as +1/-1
+    changes to single cells (and to the road's running totals from that day
+    on). Writes it cannot apply exactly (deleting a vehicle cascades into
+    accident) and every write to road (the running totals carry the road
+    names loaded with the cube) mark the cube stale and it reloads on next
+    use; ``max_age`` forces a periodic reload to pick up writes made by
+    other processes.
+    """
+
+    def __init__(self, db, max_age=None, max_days=DEFAULT_MAX_DAYS):
+        self.db = db
+        self.max_days = max_days
+        self._start = None  # numpy day of counts[0]
+        self._counts = np.zeros((0, 0, 0), dtype=np.int32)
+        self._cumulative = np.zeros((0, 0), dtype=np.int64)
+        self._roads = {}  # RoadID -> index on axis 1
+        self._severities = {}  # Severity -> index on axis 2
+        self._outside = {}  # numpy day outside the day axis -> accidents on it
+        self._road_names = {}  # RoadID -> RoadName, for the running totals
+        self._freshness = Freshness(max_age)
+        self._lock = threading.Lock()
+        db.add_write_listener(self._on_write)
+
+    def _on_write(self, tables):
+        # Road names are loaded with the cube, so a write to road (a rename, a new road) reloads it
+        if "road" in tables:
+            self.mark_stale()
+
+    def load(self):
+        """(Re)load the cube from the accident table. Returns True on success."""
+        try:
+            if load_unless_changed(self._freshness, self._lock, self._read, self._install):
+                return True
+        except Error as e:
+            print(f"Error loading the accident cube: {e}")
+            return False
+        print("The accident table kept changing while loading the accident cube; "
+              "using SQL until the next attempt.")
+        return False
+
+    def _read(self):
+        # From the primary: later writes are applied on top, so a lagging replica would lose them
+        with self.db.reading_from_primary():
+            rows = self.db.run_query(LOAD_QUERY)
+            road_names = dict(self.db.run_query(ROAD_NAMES_QUERY))
+        return self._build(rows, self.max_days) + (road_names,)
+
+    def _install(self, built):
+        (self._start, self._counts, self._cumulative,
+         self._roads, self._severities, self._outside, self._road_names) = built
+
+    @staticmethod
+    def _build(rows, max_days):
+        """The cube's arrays, index maps and outside-the-axis day counts for LOAD_QUERY rows."""
+        days = np.array([_day(row[0]) for row in rows], dtype="datetime64[D]")
+        outside = {}
+        if len(days):
+            # The max_days-long stretch starting at one of the days that holds the most accidents
+            unique_days, inverse = np.unique(days, return_inverse=True)
+            per_day = np.bincount(inverse, weights=[row[3] for row in rows])
+            ends = np.searchsorted(unique_days, unique_days + max_days)
+            before = np.concatenate(([0.0], np.cumsum(per_day)))
+            best = int(np.argmax(before[ends] - before[:len(unique_days)]))
+            first, last = unique_days[best], unique_days[ends[best] - 1]
+            inside = (days >= first) & (days <= last)
+            for day, row, keep in zip(days, rows, inside):
+                if not keep:
+                    outside[day] = outside.get(day, 0) + row[3]
+            rows = [row for row, keep in zip(rows, inside) if keep]
+            days = days[inside]
+        roads = {road: index for index, road in enumerate(sorted({row[1] for row in rows}, key=_sort_key))}
+        severities = {severity: index
+                      for index, severity in enumerate(sorted({row[2] for row in rows}, key=_sort_key))}
+        if len(days):
+            start = days.min()
+            counts = np.zeros((int((days.max() - start).astype(np.int64)) + 1, len(roads), len(severities)),
+                              dtype=np.int32)
+            np.add.at(counts, ((days - start).astype(np.int64),
+                               [roads[row[1]] for row in rows],
+                               [severities[row[2]] for row in rows]),
+                      [row[3] for row in rows])
+        else:
+            start, counts = None, np.zeros((0, 0, 0), dtype=np.int32)
+
+        cumulative = counts.sum(axis=2, dtype=np.int64).cumsum(axis=0)
+        return start, counts, cumulative, roads, severities, outside
+
+    def ready(self):
+        """Make sure the cube is loaded and fresh; False means fall back to SQL."""
+        return self.load() if self._freshness.due() else True
+
+    def mark_stale(self):
+        with self._lock:
+            self._freshness.mark_stale()
+
+    def record_insert(self, rows):
+        """Count accident rows (dicts with Date, RoadID and Severity) that were inserted."""
+        self._apply(rows, 1)
+
+    def record_delete(self, rows):
+        self._apply(rows, -1)
+
+    def record_update(self, old_row, new_row):
+        self._apply([old_row], -1)
+        self._apply([new_row], 1)
+
+    def _apply(self, rows, delta):
+        try:
+            keys = [(_day(row["Date"]), _road_id(row["RoadID"]), row["Severity"])
+                    for row in rows if row is not None and row.get("Date") is not None]
+        except (KeyError, TypeError, ValueError):
+            self.mark_stale()
+            return
+        with self._lock:
+            self._freshness.changed()
+            if self._freshness.stale:
+                return
+            for day, road, severity in keys:
+                day_index = self._day_index(day)
+                if day_index is None:
+                    count = self._outside.get(day, 0) + delta
+                    if count > 0:
+                        self._outside[day] = count
+                    else:
+                        self._outside.pop(day, None)
+                    continue
+                # The index helpers may replace self._counts with a larger array
+                cell = (day_index, self._index(self._roads, road, 1), self._index(self._severities, severity, 2))
+                self._counts[cell] += delta
+                self._cumulative[cell[0]:, cell[1]] += delta
+
+    def _day_index(self, day):
+        """Index of ``day`` on axis 0, extending the array to cover it; None past ``max_days``."""
+        if self._start is None:
+            self._start = day
+        offset = int((day - self._start).astype(np.int64))
+        if max(offset + 1, len(self._counts) - offset, len(self._counts)) > self.max_days:
+            return None
+        if offset < 0:
+            padding = np.zeros((-offset,) + self._counts.shape[1:], dtype=np.int32)
+            self._counts = np.concatenate([padding, self._counts])
+            self._cumulative = np.concatenate(
+                [np.zeros((-offset, self._cumulative.shape[1]), dtype=np.int64), self._cumulative])
+            self._start = day
+            offset = 0
+        elif offset >= len(self._counts):
+            padding = np.zeros((offset - len(self._counts) + 1,) + self._counts.shape[1:], dtype=np.int32)
+            self._counts = np.concatenate([self._counts, padding])
+            # Days after the last accident carry its running totals forward
+            last = (self._cumulative[-1:] if len(self._cumulative)
+                    else np.zeros((1, self._cumulative.shape[1]), dtype=np.int64))
+            self._cumulative = np.concatenate([self._cumulative, np.repeat(last, len(padding), axis=0)])
+        return offset
+
+    def _index(self, positions, value, axis):
+        """Index of ``value`` on ``axis``, adding a zero slice for a value not seen before."""
+        index = positions.get(value)
+        if index is None:
+            index = positions[value] = len(positions)
+            shape = list(self._counts.shape)
+            shape[axis] = 1
+            self._counts = np.concatenate([self._counts, np.zeros(shape, dtype=np.int32)], axis=axis)
+            if axis == 1:
+                column = np.zeros((len(self._cumulative), 1), dtype=np.int64)
+                self._cumulative = np.concatenate([self._cumulative, column], axis=1)
+        return index
+
+    def covers(self, start=None, end=None):
+        """True when no accident from ``start`` to ``end`` (inclusive) lies outside the day axis."""
+        # Parsed first, so an invalid date raises ValueError even when nothing lies outside
+        first = None if start is None else _day(start)
+        last = None if end is None else _day(end)
+        with self._lock:
+            return not any((first is None or day >= first) and (last is None or day <= last)
+                           for day in self._outside)
+
+    def _day_range(self, start, end):
+        """``(first, last)`` day indexes covering ``start`` to ``end`` (inclusive), clipped to the cube."""
+        first = 0 if start is None else min(
+            len(self._counts), max(0, int((_day(start) - self._start).astype(np.int64))))
+        last = len(self._counts) if end is None else min(
+            len(self._counts), int((_day(end) - self._start).astype(np.int64)) + 1)
+        return first, max(first, last)
+
+    def daily(self, start=None, end=None, road_id=None, severity=None):
+        """``(days, counts)`` for every day from ``start`` to ``end`` (inclusive) that the cube covers."""
+        with self._lock:
+            if self._start is None:
+                return np.array([], dtype="datetime64[D]"), np.array([], dtype=np.int64)
+            first, last = self._day_range(start, end)
+            block = self._counts[first:last]
+            if road_id is not None:
+                index = self._roads.get(_road_id(road_id))
+                block = block[:, index:index + 1] if index is not None else block[:, :0]
+            if severity is not None:
+                index = self._severities.get(severity)
+                block = block[:, :, index:index + 1] if index is not None else block[:, :, :0]
+            counts = block.sum(axis=(1, 2), dtype=np.int64)
+            days = self._start + np.arange(first, last)
+        return days, counts
+
+    def series(self, granularity="month", start=None, end=None, road_id=None, severity=None):
+        """``(periods, counts)``: accident totals per day/week/month/year, including empty periods.
+
+        Periods are labelled like ``2021-03-01`` (a day, or a week's Monday),
+        ``2021-03`` (a month) and ``2021`` (a year); the first and last period
+        only count the days inside the requested range.
+        """
+        days, daily = self.daily(start, end, road_id, severity)
+        if not len(days):
+            return [], np.array([], dtype=np.int64)
+        keys = period_keys(days, granularity)
+        boundaries = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        return keys[boundaries].astype(str).tolist(), np.add.reduceat(daily, boundaries)
+
+    def series_result(self, granularity="month", start=None, end=None, road_id=None, severity=None,
+                      columnar=False):
+        """``series`` shaped like the SQL query methods' results; None if the range is not covered."""
+        if not self.covers(start, end):
+            return None
+        periods, counts = self.series(granularity, start, end, road_id, severity)
+        if columnar:
+            return ColumnarResult(list(SERIES_COLUMNS), {"Period": np.array(periods, dtype=object),
+                                                         "AccidentCount": counts})
+        return make_rows(SERIES_COLUMNS, zip(periods, counts.tolist()))
+
+    def running_total(self, road_id, start=None, end=None):
+        """Accidents on one road from ``start`` to ``end`` (inclusive): two lookups in the running totals."""
+        with self._lock:
+            index = self._roads.get(_road_id(road_id))
+            if self._start is None or index is None:
+                return 0
+            first, last = self._day_range(start, end)
+            if first == last:
+                return 0
+            before = self._cumulative[first - 1, index] if first else 0
+            return int(self._cumulative[last - 1, index] - before)
+
+    def running_totals(self, road_ids=None, start=None, end=None):
+        """
+        ``{road_id: (days, daily, running)}`` for the days with accidents from ``start`` to ``end``.
+
+        ``running`` counts from ``start`` (or the first accident), like a
+        window SUM over the same date range; ``road_ids`` limits the roads.
+        """
+        with self._lock:
+            if self._start is None:
+                return {}
+            first, last = self._day_range(start, end)
+            if road_ids is None:
+                roads = {road: index for road, index in self._roads.items() if road is not None}
+            else:
+                roads = {road: self._roads[road] for road in map(_road_id, road_ids) if road in self._roads}
+            indexes = list(roads.values())
+            before = (self._cumulative[first - 1, indexes] if first
+                      else np.zeros(len(indexes), dtype=np.int64))
+            window = self._cumulative[first:last, indexes]
+        # Daily counts are the steps between consecutive running totals
+        daily = np.diff(window, axis=0, prepend=before[np.newaxis])
+        running = window - before
+        days = self._start + np.arange(first, last)
+        totals = {}
+        for column, road in enumerate(roads):
+            offsets = np.flatnonzero(daily[:, column])
+            if len(offsets):
+                totals[road] = (days[offsets], daily[offsets, column], running[offsets, column])
+        return totals
+
+    def running_totals_result(self, road_id=None, start=None, end=None, columnar=False):
+        """``running_totals`` shaped like the running_total_accidents_per_road query; None if not covered."""
+        if not self.covers(start, end):
+            return None
+        with self._lock:
+            names = self._road_names
+        totals = self.running_totals(None if road_id is None else [road_id], start, end)
+        rows = []
+        # Like the SQL: roads missing from the road table are left out, ordered by RoadName, Date
+        for road in sorted((road for road in totals if road in names), key=lambda road: _sort_key(names[road])):
+            days, daily, running = totals[road]
+            rows.extend(zip([names[road]] * len(days), days.tolist(), daily.tolist(), running.tolist()))
+        if columnar:
+            return ColumnarResult.from_rows(RUNNING_TOTAL_COLUMNS, rows)
+        return make_rows(RUNNING_TOTAL_COLUMNS, rows)
+
+    def monthly_totals(self, columnar=False):
+        """Accidents per calendar month over all years, like the get_monthly_accidents query; None if not covered."""
+        if not self.covers():
+            return None
+        days, daily = self.daily()
+        months = days.astype("datetime64[M]").astype(np.int64) % 12
+        totals = np.bincount(months, weights=daily, minlength=12).astype(np.int64)
+        rows = [(calendar.month_name[month + 1], int(totals[month])) for month in range(12) if totals[month]]
+        if columnar:
+            return ColumnarResult.from_rows(("month", "count"), rows)
+        return make_rows(("month", "count"), rows)
+
+
+def _road_id(value):
+    return int(value) if value is not None else None
+
+
+def _sort_key(value):
+    # NULL RoadIDs/Severities sort first
+    return (value is not None, value)
+
+
+# The DatabaseManager queries the cube can answer; each takes the method's arguments
+CUBE_QUERIES = {
+    "get_monthly_accidents": DailyAccidentCube.monthly_totals,
+    "running_total_accidents_per_road": DailyAccidentCube.running_totals_result,
+}
+
+
+def _cube_answer(db, method_name, *args, **kwargs):
+    cube = db.accident_cube
+    if cube is None or not cube.ready():
+        return None
+    return CUBE_QUERIES[method_name](cube, *args, **kwargs)
+
+
+# Answers a query in CUBE_QUERIES from the DailyAccidentCube unless it is disabled,
+# cannot be loaded or does not cover the requested dates
+accident_cube_query = fast_path(_cube_answer)
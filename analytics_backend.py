@@ -0,0 +1,444 @@
+import datetime
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+from mysql.connector import Error
+
+from columnar import ColumnarResult
+from fast_path import fast_path
+from queries import QUERIES
+from row_types import make_rows
+
+# Scan-heavy methods that can run on an embedded copy, and the tables each one reads
+ANALYTICS_TABLES = {
+    "advanced_aggregate_query": ("accident",),
+    "running_total_accidents_per_road": ("road", "accident"),
+    "percentage_contribution_of_accidents": ("road", "accident"),
+    "partitioned_sum_of_fines": ("violation",),
+    "olap_query": ("vehicleviolation", "violation"),
+}
+
+
+# Computed result columns and the (kind, MySQL column type) MySQL returns them as. Result
+# columns named like a copied column get that column's type; everything else is left as is.
+RESULT_TYPES = {
+    "running_total_accidents_per_road": {"RunningTotal": ("decimal", "decimal(42,0)")},
+    "percentage_contribution_of_accidents": {"PercentageContribution": ("decimal", "decimal(27,2)")},
+    "partitioned_sum_of_fines": {"TotalFineByType": ("decimal", "decimal(32,2)")},
+}
+
+# Column kind for each MySQL DATA_TYPE; anything not listed is copied as text
+_MYSQL_KINDS = {"tinyint": "int", "smallint": "int", "mediumint": "int", "int": "int", "bigint": "int",
+                "year": "int", "decimal": "decimal", "float": "float", "double": "float",
+                "date": "date", "datetime": "datetime", "timestamp": "datetime"}
+
+
+def _tables_read(methods):
+    return sorted({table for tables in methods.values() for table in tables})
+
+
+class AnalyticsError(Exception):
+    """The embedded engine could not answer; callers fall back to MySQL."""
+
+
+def _sql_value(value):
+    # TIME columns arrive as timedelta, which neither engine stores
+    if isinstance(value, datetime.timedelta):
+        return str(value)
+    return value
+
+
+def _decimal_scale(column_type):
+    match = re.search(r"\(\s*\d+\s*,\s*(\d+)\s*\)", column_type or "")
+    return int(match.group(1)) if match else None
+
+
+def _typed_value(value, kind, column_type):
+    """An engine's result value as the type MySQL returns for ``kind`` (Decimal, date, datetime)."""
+    if value is None:
+        return None
+    if kind == "decimal" and not isinstance(value, Decimal):
+        value = Decimal(str(value))
+        scale = _decimal_scale(column_type)
+        return value.quantize(Decimal(1).scaleb(-scale)) if scale is not None else value
+    if kind == "date" and isinstance(value, str):
+        return datetime.date.fromisoformat(value)
+    if kind == "datetime" and isinstance(value, str):
+        return datetime.datetime.fromisoformat(value)
+    return value
+
+
+class AnalyticsBackend:
+    """
+    Embedded copy of the analytics tables that answers the OLAP-style queries.
+
+    MySQL stays the system of record: ``sync`` copies the tables the
+    analytics methods read, and DatabaseManager marks a table dirty whenever
+    it writes to it. A background thread re-copies dirty tables
+    ``sync_debounce`` seconds after the first write of a burst (with
+    ``sync_on_write``) and everything every ``sync_interval`` seconds;
+    queries keep being answered from the last copy meanwhile, and when MySQL
+    is unreachable, so a persisted copy lets the analytics pages work offline.
+    Tables are copied one ``stream_records`` batch at a time into a staging
+    table that replaces the old copy once complete; only one sync runs at a
+    time.
+
+    Subclasses provide the engine: ``_create_table``, ``_insert``,
+    ``_replace_table``, ``_execute`` and ``_existing_tables``.
+    """
+
+    name = None
+    # The engine's own exception classes (a failed copy, a locked or full database file)
+    engine_errors = ()
+    # Per-engine replacements for QUERIES statements the engine cannot run as written
+    statements = {}
+
+    def __init__(self, sync_interval=None, sync_on_write=True, sync_debounce=1.0):
+        self.sync_interval = sync_interval
+        self.sync_on_write = sync_on_write
+        self.sync_debounce = sync_debounce
+        self.methods = dict(ANALYTICS_TABLES)  # method -> tables it reads, narrowed by attach
+        self.tables = _tables_read(self.methods)
+        self.db = None
+        self._lock = threading.RLock()  # guards the engine connection
+        self._sync_lock = threading.Lock()  # one copy at a time
+        self._dirty_lock = threading.Lock()
+        self._dirty = set(self.tables)
+        self._loaded = set()
+        self._copy_started = {}  # table -> monotonic time its last successful copy started
+        self._column_types = {}  # column name -> (kind, MySQL column type), over all copied tables
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.syncs = 0
+        self.sync_errors = 0
+
+    def attach(self, db, skip=()):
+        """
+        Connect the backend to its DatabaseManager, copy the tables and start background syncing.
+
+        ``skip`` names analytics methods the manager answers some other way
+        (its in-memory cubes); only the tables the remaining methods read are copied.
+        """
+        self.db = db
+        self.methods = {method: tables for method, tables in ANALYTICS_TABLES.items() if method not in skip}
+        self.tables = _tables_read(self.methods)
+        with self._dirty_lock:
+            self._dirty = set(self.tables)
+        self._loaded = set(self._existing_tables()) & set(self.tables)
+        self.sync()
+        if self.sync_interval or self.sync_on_write:
+            self._thread = threading.Thread(target=self._sync_in_background, name=f"{self.name}-sync", daemon=True)
+            self._thread.start()
+
+    def supports(self, method_name):
+        return method_name in self.methods
+
+    def mark_dirty(self, table):
+        if table in self.tables:
+            with self._dirty_lock:
+                self._dirty.add(table)
+            if self.sync_on_write:
+                self._wake.set()
+
+    def dirty_tables(self):
+        with self._dirty_lock:
+            return set(self._dirty)
+
+    def sync(self, tables=None):
+        """Copy ``tables`` (all analytics tables by default) from MySQL. Returns True on success."""
+        tables = sorted(tables if tables is not None else self.tables)
+        requested = time.monotonic()
+        with self._sync_lock:
+            for table in tables:
+                # Cleared before reading, so a write that lands during the copy marks it dirty again
+                with self._dirty_lock:
+                    if table not in self._dirty and self._copy_started.get(table, -1.0) >= requested:
+                        continue  # Copied by a sync that ran while this one waited for the lock
+                    self._dirty.discard(table)
+                started = time.monotonic()
+                try:
+                    self._copy_table(table)
+                except (Error, ValueError) + self.engine_errors as e:
+                    with self._dirty_lock:
+                        self._dirty.add(table)
+                    self.sync_errors += 1
+                    print(f"Error syncing {table} to the {self.name} analytics backend: {e}")
+                    return False
+                self._copy_started[table] = started
+                # Cached results were computed from the previous copy
+                if self.db.cache is not None:
+                    self.db.cache.invalidate(table)
+            self.syncs += 1
+        return True
+
+    @contextmanager
+    def _transaction(self):
+        """Run the block in one engine transaction, rolled back (and the error re-raised) if it fails."""
+        self.connection.execute("BEGIN TRANSACTION")
+        try:
+            yield
+            self.connection.execute("COMMIT")
+        except BaseException:
+            try:
+                self.connection.execute("ROLLBACK")
+            except self.engine_errors:
+                pass  # The failure already ended the transaction
+            raise
+
+    def _sync_in_background(self):
+        while not self._stop.is_set():
+            woken = self._wake.wait(self.sync_interval)
+            if self._stop.is_set():
+                break
+            if woken:
+                # Let a burst of writes settle so it costs one copy, not one per write
+                self._stop.wait(self.sync_debounce)
+                self._wake.clear()
+                dirty = self.dirty_tables()
+                if dirty:
+                    self.sync(dirty)
+            else:
+                self.sync()
+
+    def _copy_table(self, table):
+        """Stream ``table`` into a staging copy, then swap it in for the old copy."""
+        columns = self.db.get_columns(table)
+        if not columns:
+            raise ValueError("no columns (table missing or MySQL unreachable)")
+        staging = f"{table}__staging"
+        types = None
+        for batch in self.db.stream_records(table):
+            rows = [tuple(_sql_value(value) for value in row) for row in batch]
+            with self._lock:
+                if types is None:
+                    types = self._table_types(table, columns, rows)
+                    self._create_table(staging, columns, types)
+                self._insert(staging, columns, rows)
+        with self._lock:
+            if types is None:
+                types = self._table_types(table, columns, [])
+                self._create_table(staging, columns, types)
+            self._replace_table(table, staging)
+            self._loaded.add(table)
+            self._column_types.update(zip(columns, types))
+
+    def _table_types(self, table, columns, rows):
+        """``(kind, MySQL column type)`` per column, from the schema registry or else the first rows."""
+        schema = self.db.schema.get(table)
+        declared = {column.name: column for column in schema.columns} if schema else {}
+        types = []
+        for index, name in enumerate(columns):
+            column = declared.get(name)
+            if column is not None:
+                types.append((_MYSQL_KINDS.get(column.data_type.lower(), "text"), column.column_type))
+            else:
+                types.append((self._value_kind(row[index] for row in rows), None))
+        return types
+
+    def query(self, method_name):
+        """Run an analytics method's statement and return ``(columns, rows)``."""
+        tables = self.methods[method_name]
+        if not self._loaded.issuperset(tables):
+            raise AnalyticsError(f"{', '.join(sorted(set(tables) - self._loaded))} not copied yet")
+        sql = self.statements.get(method_name, QUERIES[method_name])
+        try:
+            with self._lock:
+                columns, rows = self._execute(sql.strip().rstrip(";"))
+        except Exception as e:
+            raise AnalyticsError(str(e)) from e
+        return columns, self._typed_rows(method_name, columns, rows)
+
+    def _typed_rows(self, method_name, columns, rows):
+        """Rows with dates and decimals converted to the types the MySQL statement returns."""
+        computed = RESULT_TYPES.get(method_name, {})
+        converted = []
+        for index, column in enumerate(columns):
+            kind, column_type = computed.get(column) or self._column_types.get(column) or (None, None)
+            if kind in ("decimal", "date", "datetime"):
+                converted.append((index, kind, column_type))
+        if not converted:
+            return rows
+        typed = []
+        for row in rows:
+            row = list(row)
+            for index, kind, column_type in converted:
+                row[index] = _typed_value(row[index], kind, column_type)
+            typed.append(tuple(row))
+        return typed
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+
+    @staticmethod
+    def _value_kind(values):
+        """Column kind from the first non-NULL value, for columns the schema registry does not know."""
+        for value in values:
+            if value is None:
+                continue
+            if isinstance(value, int):
+                return "int"
+            if isinstance(value, Decimal):
+                return "decimal"
+            if isinstance(value, float):
+                return "float"
+            if isinstance(value, datetime.datetime):
+                return "datetime"
+            if isinstance(value, datetime.date):
+                return "date"
+            return "text"
+        return "text"
+
+
+class SQLiteBackend(AnalyticsBackend):
+    """Analytics copy in SQLite (standard library; ``path=":memory:"`` keeps it in RAM)."""
+
+    name = "sqlite"
+    engine_errors = (sqlite3.Error,)
+    statements = {
+        # SQLite has no WITH ROLLUP: add the grand-total row explicitly
+        "advanced_aggregate_query": """
+            SELECT Severity, COUNT(*) AS AccidentCount
+            FROM accident
+            GROUP BY Severity
+            UNION ALL
+            SELECT NULL, COUNT(*) FROM accident
+        """,
+    }
+    # Decimals are stored as REAL so they sort and aggregate as numbers, dates as ISO text;
+    # query() turns both back into Decimal and date values
+    TYPES = {"int": "INTEGER", "decimal": "REAL", "float": "REAL", "datetime": "TEXT", "date": "TEXT",
+             "text": "TEXT"}
+
+    def __init__(self, path=":memory:", sync_interval=None, sync_on_write=True, sync_debounce=1.0):
+        super().__init__(sync_interval, sync_on_write, sync_debounce)
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+
+    def _existing_tables(self):
+        with self._lock:
+            rows = self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+        return [row[0] for row in rows]
+
+    def _create_table(self, table, columns, types):
+        column_defs = ", ".join(f'"{column}" {self.TYPES[kind]}' for column, (kind, _) in zip(columns, types))
+        self.connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+        self.connection.execute(f'CREATE TABLE "{table}" ({column_defs})')
+
+    def _insert(self, table, columns, rows):
+        placeholders = ", ".join(["?"] * len(columns))
+        with self._transaction():
+            self.connection.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})',
+                                        [tuple(_sqlite_value(value) for value in row) for row in rows])
+
+    def _replace_table(self, table, staging):
+        with self._transaction():
+            self.connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+            self.connection.execute(f'ALTER TABLE "{staging}" RENAME TO "{table}"')
+
+    def _execute(self, sql):
+        cursor = self.connection.execute(sql)
+        columns = [description[0] for description in cursor.description]
+        return columns, cursor.fetchall()
+
+    def close(self):
+        super().close()
+        with self._lock:
+            self.connection.close()
+
+
+def _sqlite_value(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+class DuckDBBackend(AnalyticsBackend):
+    """Analytics copy in DuckDB, a columnar engine (needs the optional ``duckdb`` package)."""
+
+    name = "duckdb"
+    statements = {
+        "advanced_aggregate_query": """
+            SELECT Severity, COUNT(*) AS AccidentCount
+            FROM accident
+            GROUP BY ROLLUP (Severity)
+        """,
+    }
+    TYPES = {"int": "BIGINT", "decimal": "DECIMAL(38, 10)", "float": "DOUBLE", "datetime": "TIMESTAMP",
+             "date": "DATE", "text": "VARCHAR"}
+
+    def __init__(self, path=":memory:", sync_interval=None, sync_on_write=True, sync_debounce=1.0):
+        super().__init__(sync_interval, sync_on_write, sync_debounce)
+        import duckdb
+        self.engine_errors = (duckdb.Error,)
+        self.connection = duckdb.connect(path)
+
+    def _existing_tables(self):
+        with self._lock:
+            rows = self.connection.execute("SELECT table_name FROM information_schema.tables").fetchall()
+        return [row[0] for row in rows]
+
+    def _create_table(self, table, columns, types):
+        # DECIMAL keeps the MySQL precision and scale when the schema registry knows them
+        column_defs = ", ".join(
+            f'"{column}" {column_type.upper() if kind == "decimal" and column_type else self.TYPES[kind]}'
+            for column, (kind, column_type) in zip(columns, types))
+        self.connection.execute(f'CREATE OR REPLACE TABLE "{table}" ({column_defs})')
+
+    def _insert(self, table, columns, rows):
+        placeholders = ", ".join(["?"] * len(columns))
+        with self._transaction():
+            self.connection.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})', rows)
+
+    def _replace_table(self, table, staging):
+        with self._transaction():
+            self.connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+            self.connection.execute(f'ALTER TABLE "{staging}" RENAME TO "{table}"')
+
+    def _execute(self, sql):
+        cursor = self.connection.execute(sql)
+        columns = [description[0] for description in cursor.description]
+        return columns, cursor.fetchall()
+
+    def close(self):
+        super().close()
+        with self._lock:
+            self.connection.close()
+
+
+BACKENDS = {"sqlite": SQLiteBackend, "duckdb": DuckDBBackend}
+
+
+def create_backend(kind, path=":memory:", sync_interval=None, sync_on_write=True, sync_debounce=1.0):
+    """Build the analytics backend named ``kind`` ("sqlite" or "duckdb")."""
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown analytics backend '{kind}'.")
+    return BACKENDS[kind](path=path, sync_interval=sync_interval, sync_on_write=sync_on_write,
+                          sync_debounce=sync_debounce)
+
+
+def _backend_answer(db, method_name, *args, columnar=False, **kwargs):
+    backend = db.analytics
+    # The copies only hold the unfiltered statements, so calls with filter arguments go to MySQL
+    filtered = any(value is not None for value in args + tuple(kwargs.values()))
+    if backend is None or filtered or not backend.supports(method_name):
+        return None
+    try:
+        columns, rows = backend.query(method_name)
+    except AnalyticsError as e:
+        print(f"Analytics backend could not run {method_name}, using MySQL: {e}")
+        return None
+    return ColumnarResult.from_rows(columns, rows) if columnar else make_rows(columns, rows)
+
+
+# Runs a DatabaseManager analytics method on the embedded backend unless none is
+# attached or it cannot answer
+analytics_query = fast_path(_backend_answer)
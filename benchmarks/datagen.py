@@ -0,0 +1,246 @@
+"""
+Deterministic synthetic data for all ten tables.
+
+Row counts are BASE_ROWS multiplied by a scale factor, and every value
+comes from one seeded ``random.Random``, so the same scale and seed always
+produce the same database. Foreign keys are valid by construction: the
+tables are emptied first (which restarts their auto-increment counters),
+then loaded parents-first so the generated IDs are 1..N.
+
+    python -m benchmarks.datagen --database bench --scale 2 --seed 42 --create-schema
+
+Loading goes through ``DatabaseManager.create_records``, so it works with
+any MySQL-compatible server (MySQL, MariaDB, a throwaway container, ...).
+"""
+import argparse
+import datetime
+import random
+
+# Rows per table at scale 1
+BASE_ROWS = {
+    "road": 50,
+    "camera": 100,
+    "roadcamera": 150,
+    "user": 1000,
+    "address": 1000,
+    "phonenumber": 1500,
+    "vehicle": 1000,
+    "violation": 40,
+    "vehicleviolation": 3000,
+    "accident": 5000,
+}
+
+# Parents before children
+LOAD_ORDER = ("road", "camera", "roadcamera", "user", "address", "phonenumber",
+              "vehicle", "violation", "vehicleviolation", "accident")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS road (
+    RoadID INT AUTO_INCREMENT PRIMARY KEY,
+    RoadName VARCHAR(100) NOT NULL,
+    RoadType VARCHAR(50),
+    NumLanes INT
+);
+CREATE TABLE IF NOT EXISTS camera (
+    CameraID INT AUTO_INCREMENT PRIMARY KEY,
+    Status VARCHAR(30),
+    LastInspection DATE
+);
+CREATE TABLE IF NOT EXISTS roadcamera (
+    RoadID INT NOT NULL,
+    CameraID INT NOT NULL,
+    PRIMARY KEY (RoadID, CameraID),
+    FOREIGN KEY (RoadID) REFERENCES road (RoadID) ON DELETE CASCADE ON UPDATE CASCADE,
+    FOREIGN KEY (CameraID) REFERENCES camera (CameraID) ON DELETE CASCADE ON UPDATE CASCADE
+);
+CREATE TABLE IF NOT EXISTS user (
+    UserID INT PRIMARY KEY,
+    UserName VARCHAR(100) NOT NULL,
+    UserRole VARCHAR(30)
+);
+CREATE TABLE IF NOT EXISTS address (
+    AddressID INT AUTO_INCREMENT PRIMARY KEY,
+    UserID INT NOT NULL,
+    Pincode VARCHAR(10),
+    State VARCHAR(50),
+    Country VARCHAR(50),
+    FOREIGN KEY (UserID) REFERENCES user (UserID) ON DELETE CASCADE ON UPDATE CASCADE
+);
+CREATE TABLE IF NOT EXISTS phonenumber (
+    PhoneID INT AUTO_INCREMENT PRIMARY KEY,
+    UserID INT NOT NULL,
+    PhoneNumber VARCHAR(20),
+    FOREIGN KEY (UserID) REFERENCES user (UserID) ON DELETE CASCADE ON UPDATE CASCADE
+);
+CREATE TABLE IF NOT EXISTS vehicle (
+    VehicleID INT AUTO_INCREMENT PRIMARY KEY,
+    LicensePlate VARCHAR(20) NOT NULL,
+    VehicleType VARCHAR(30),
+    OwnerName VARCHAR(100)
+);
+CREATE TABLE IF NOT EXISTS violation (
+    ViolationID INT AUTO_INCREMENT PRIMARY KEY,
+    ViolationType VARCHAR(50) NOT NULL,
+    FineAmount DECIMAL(10, 2)
+);
+CREATE TABLE IF NOT EXISTS vehicleviolation (
+    VehicleID INT NOT NULL,
+    ViolationID INT NOT NULL,
+    PRIMARY KEY (VehicleID, ViolationID),
+    FOREIGN KEY (VehicleID) REFERENCES vehicle (VehicleID) ON DELETE CASCADE ON UPDATE CASCADE,
+    FOREIGN KEY (ViolationID) REFERENCES violation (ViolationID) ON DELETE CASCADE ON UPDATE CASCADE
+);
+CREATE TABLE IF NOT EXISTS accident (
+    AccidentID INT AUTO_INCREMENT PRIMARY KEY,
+    Severity VARCHAR(20),
+    Date DATE,
+    Time TIME,
+    VehicleID INT,
+    RoadID INT,
+    FOREIGN KEY (VehicleID) REFERENCES vehicle (VehicleID) ON DELETE CASCADE ON UPDATE CASCADE,
+    FOREIGN KEY (RoadID) REFERENCES road (RoadID) ON DELETE CASCADE ON UPDATE CASCADE
+);
+"""
+
+SEVERITIES = ("Low", "Minor", "Medium", "High", "Major", "Fatal")
+SEVERITY_WEIGHTS = (30, 25, 20, 12, 9, 4)
+ROAD_TYPES = ("Highway", "Arterial", "Collector", "Local", "Expressway")
+CAMERA_STATUSES = ("Operational", "Maintenance", "Offline")
+USER_ROLES = ("Citizen", "Officer", "Admin")
+VEHICLE_TYPES = ("Car", "Truck", "Motorcycle", "Bus", "Van")
+VIOLATION_TYPES = ("Speeding", "Red Light", "Illegal Parking", "No Seatbelt", "DUI",
+                   "Expired Registration", "Reckless Driving", "Wrong Way")
+STATES = ("CA", "TX", "NY", "FL", "IL", "WA", "MA", "OH")
+NAMES = ("Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Avery", "Quinn", "Jamie")
+START_DATE = datetime.date(2020, 1, 1)
+DATE_RANGE_DAYS = 5 * 365
+
+
+def row_counts(scale):
+    return {table: max(1, int(round(rows * scale))) for table, rows in BASE_ROWS.items()}
+
+
+def generate(scale=1.0, seed=42):
+    """
+    Return ``{table: [row tuples in INSERT_COLUMNS order]}`` for the given scale.
+
+    Generated IDs assume every table starts empty, so row N of a table with an
+    auto-increment key gets ID N.
+    """
+    rng = random.Random(seed)
+    counts = row_counts(scale)
+    # Users and vehicles share IDs: users_and_vehicle_violations joins user.UserID to vehicle.VehicleID
+    counts["user"] = counts["vehicle"] = max(counts["user"], counts["vehicle"])
+    data = {}
+
+    data["road"] = [(f"Road {i}", rng.choice(ROAD_TYPES), rng.randint(1, 6))
+                    for i in range(1, counts["road"] + 1)]
+    data["camera"] = [(rng.choices(CAMERA_STATUSES, (80, 15, 5))[0],
+                       START_DATE + datetime.timedelta(days=rng.randrange(DATE_RANGE_DAYS)))
+                      for _ in range(counts["camera"])]
+    data["roadcamera"] = _unique_pairs(rng, counts["roadcamera"], counts["road"], counts["camera"])
+
+    data["user"] = [(i, f"{rng.choice(NAMES)} {i}", rng.choices(USER_ROLES, (90, 8, 2))[0])
+                    for i in range(1, counts["user"] + 1)]
+    data["address"] = [(rng.randint(1, counts["user"]), f"{rng.randint(10000, 99999)}",
+                        rng.choice(STATES), "USA")
+                       for _ in range(counts["address"])]
+    data["phonenumber"] = [(rng.randint(1, counts["user"]), f"555-{rng.randint(0, 9999999):07d}")
+                           for _ in range(counts["phonenumber"])]
+
+    data["vehicle"] = [(f"PL{i:07d}", rng.choice(VEHICLE_TYPES), f"{rng.choice(NAMES)} {i}")
+                       for i in range(1, counts["vehicle"] + 1)]
+    data["violation"] = [(rng.choice(VIOLATION_TYPES), round(rng.uniform(25, 500), 2))
+                         for _ in range(counts["violation"])]
+    data["vehicleviolation"] = _unique_pairs(rng, counts["vehicleviolation"],
+                                             counts["vehicle"], counts["violation"])
+
+    accidents = []
+    for _ in range(counts["accident"]):
+        date = START_DATE + datetime.timedelta(days=rng.randrange(DATE_RANGE_DAYS))
+        time = datetime.time(rng.randrange(24), rng.randrange(60))
+        accidents.append((rng.choices(SEVERITIES, SEVERITY_WEIGHTS)[0], date, time,
+                          rng.randint(1, counts["vehicle"]), rng.randint(1, counts["road"])))
+    data["accident"] = accidents
+    return data
+
+
+def _unique_pairs(rng, count, left_max, right_max):
+    """``count`` distinct (left, right) ID pairs for a composite-key link table."""
+    count = min(count, left_max * right_max)
+    pairs = set()
+    while len(pairs) < count:
+        pairs.add((rng.randint(1, left_max), rng.randint(1, right_max)))
+    return sorted(pairs)
+
+
+def create_schema(db):
+    """Create any missing tables (see SCHEMA) and reload the schema registry."""
+    with db.get_cursor() as cursor:
+        for statement in SCHEMA.split(";"):
+            if statement.strip():
+                cursor.execute(statement)
+    db.refresh_schema()
+
+
+def truncate_tables(db):
+    """Empty every table and restart the auto-increment counters."""
+    with db.get_cursor() as cursor:
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
+        try:
+            for table in LOAD_ORDER:
+                cursor.execute(f"TRUNCATE TABLE `{table}`;")
+        finally:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
+
+
+def load(db, scale=1.0, seed=42, batch_size=1000):
+    """Replace the contents of all tables with generated data. Returns rows inserted per table."""
+    data = generate(scale, seed)
+    truncate_tables(db)
+    inserted = {}
+    for table in LOAD_ORDER:
+        results = db.create_records(table, data[table], batch_size=batch_size, stop_on_error=True)
+        errors = [result["error"] for result in results if result["error"]]
+        if errors:
+            raise RuntimeError(f"Loading {table} failed: {errors[0]}")
+        inserted[table] = sum(result["inserted"] for result in results)
+    if db.cache is not None:
+        db.cache.clear()
+    if db.vehicle_sets is not None:
+        db.vehicle_sets.load()
+    if db.accident_cube is not None:
+        db.accident_cube.load()
+    if db.olap_cubes is not None:
+        db.olap_cubes.load()
+    if db.analytics is not None:
+        db.analytics.sync()
+    return inserted
+
+
+def main():
+    from crud_flask import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Fill the database with synthetic data.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--database", default="grp4-bench")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--create-schema", action="store_true", help="create missing tables first")
+    args = parser.parse_args()
+
+    db = DatabaseManager(host=args.host, user=args.user, password=args.password,
+                         database=args.database, cache_size=0)
+    try:
+        if args.create_schema:
+            create_schema(db)
+        for table, count in load(db, args.scale, args.seed).items():
+            print(f"{table:<18}{count:>10}")
+    finally:
+        db.close_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare the memory used by 1M query rows in each result representation.
+
+Rows mimic ``olap_query`` (VehicleID, ViolationID, FineAmount, FineRank).
+Run from the project root:
+
+    python -m benchmarks.row_memory [row_count]
+"""
+import gc
+import sys
+import tracemalloc
+from decimal import Decimal
+
+from row_types import make_rows
+
+COLUMNS = ("VehicleID", "ViolationID", "FineAmount", "FineRank")
+
+
+def fetched_rows(count):
+    # What the connector hands back: one tuple per row
+    return [(i % 50000, i % 40, Decimal(50 + i % 400), 1 + i % 3) for i in range(count)]
+
+
+def as_dicts(rows):
+    return [{"VehicleID": row[0], "ViolationID": row[1], "FineAmount": row[2], "FineRank": row[3]}
+            for row in rows]
+
+
+def as_row_types(rows):
+    return make_rows(COLUMNS, rows)
+
+
+def as_columnar(rows):
+    import numpy as np
+    return {column: np.array(values, dtype=np.float64 if column == "FineAmount" else np.int64)
+            for column, values in zip(COLUMNS, zip(*rows))}
+
+
+def measure(build, count):
+    """Bytes still allocated after converting ``count`` fetched rows with ``build``."""
+    gc.collect()
+    tracemalloc.start()
+    result = build(fetched_rows(count))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    baseline = None
+    print(f"{'representation':<16}{'MiB':>10}{'bytes/row':>12}{'vs dicts':>10}")
+    for name, build in (("dicts", as_dicts), ("row types", as_row_types),
+                        ("tuples", lambda rows: rows), ("columnar", as_columnar)):
+        used = measure(build, count)
+        baseline = baseline or used
+        print(f"{name:<16}{used / 2**20:>10.1f}{used / count:>12.1f}{used / baseline:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
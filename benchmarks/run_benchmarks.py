@@ -0,0 +1,176 @@
+"""
+Time every read-only DatabaseManager method at one or more data scales.
+
+For each scale the database is refilled with benchmarks.datagen, then each
+method runs ``--warmup`` untimed and ``--repeat`` timed times with the result
+cache disabled. The report is written as JSON and CSV, named after the
+current git commit, so two runs can be compared:
+
+    python -m benchmarks.run_benchmarks --database grp4-bench --scales 1,5 --create-schema
+    python -m benchmarks.run_benchmarks --database grp4-bench --compare benchmarks/results/<old>.json
+
+Point it at a scratch database: every table in it is truncated.
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from benchmarks import datagen
+from crud_flask import DatabaseManager, TABLES
+from metrics import result_size
+from queries import QUERIES
+
+# Arguments for the query methods that take any; everything else is called without
+QUERY_ARGS = {
+    "users_and_vehicle_violations": (100,),
+    "set_membership_query": (1,),
+}
+
+CSV_FIELDS = ("scale", "method", "repeat", "rows", "min_seconds", "median_seconds",
+              "mean_seconds", "p95_seconds", "max_seconds")
+
+
+def benchmark_calls(db):
+    """(name, callable, row counter) for every read-only method worth timing."""
+    rows = lambda result: result_size(result)[0]
+    calls = [(name, lambda name=name: getattr(db, name)(*QUERY_ARGS.get(name, ())), rows)
+             for name in QUERIES]
+    calls += [(f"read_record:{table}", lambda table=table: db.read_record(table), rows) for table in TABLES]
+    calls += [("read_page:accident", lambda: db.read_page("accident", page_size=50), rows),
+              ("set_membership_batch", lambda: db.set_membership_batch(range(1, 1001)), rows),
+              # The stream is drained batch by batch; the call returns the row count
+              ("stream_records:accident",
+               lambda: sum(len(batch) for batch in db.stream_records("accident")), lambda count: count)]
+    return calls
+
+
+def time_call(call, repeat, warmup):
+    for _ in range(warmup):
+        call()
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = call()
+        durations.append(time.perf_counter() - start)
+    return durations, result
+
+
+def summarize(scale, name, durations, rows):
+    ordered = sorted(durations)
+    return {
+        "scale": scale,
+        "method": name,
+        "repeat": len(durations),
+        "rows": rows,
+        "min_seconds": ordered[0],
+        "median_seconds": statistics.median(ordered),
+        "mean_seconds": statistics.fmean(ordered),
+        "p95_seconds": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        "max_seconds": ordered[-1],
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_report(report, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    base = os.path.join(output_dir, f"benchmark-{report['meta']['commit']}-{stamp}")
+    with open(base + ".json", "w", encoding="utf-8") as json_file:
+        json.dump(report, json_file, indent=2)
+    with open(base + ".csv", "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(report["results"])
+    return base + ".json", base + ".csv"
+
+
+def compare(report, baseline_path):
+    """Print the median time of every (scale, method) relative to a previous report."""
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    previous = {(row["scale"], row["method"]): row for row in baseline["results"]}
+    print(f"\nCompared with {baseline['meta']['commit']} ({baseline_path}):")
+    print(f"{'scale':>6}  {'method':<45}{'before ms':>11}{'after ms':>11}{'ratio':>8}")
+    for row in report["results"]:
+        old = previous.get((row["scale"], row["method"]))
+        if old is None:
+            continue
+        ratio = row["median_seconds"] / old["median_seconds"] if old["median_seconds"] else float("inf")
+        print(f"{row['scale']:>6}  {row['method']:<45}{old['median_seconds'] * 1000:>11.2f}"
+              f"{row['median_seconds'] * 1000:>11.2f}{ratio:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DatabaseManager methods at several data scales.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--database", default="grp4-bench")
+    parser.add_argument("--scales", default="1", help="comma-separated scale factors, e.g. 1,5,10")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--only", help="comma-separated method names to run")
+    parser.add_argument("--in-memory-sets", action="store_true", help="answer set queries from memory")
+    parser.add_argument("--create-schema", action="store_true", help="create missing tables first")
+    parser.add_argument("--output-dir", default=os.path.join("benchmarks", "results"))
+    parser.add_argument("--compare", help="previous JSON report to compare against")
+    args = parser.parse_args()
+
+    scales = [float(scale) for scale in args.scales.split(",")]
+    only = set(args.only.split(",")) if args.only else None
+    db = DatabaseManager(host=args.host, user=args.user, password=args.password, database=args.database,
+                         cache_size=0, in_memory_sets=args.in_memory_sets)
+    results = []
+    try:
+        if args.create_schema:
+            datagen.create_schema(db)
+        for scale in scales:
+            inserted = datagen.load(db, scale, args.seed)
+            print(f"\nScale {scale:g}: " + ", ".join(f"{table}={count}" for table, count in inserted.items()))
+            for name, call, count_rows in benchmark_calls(db):
+                if only and name not in only:
+                    continue
+                durations, result = time_call(call, args.repeat, args.warmup)
+                row = summarize(scale, name, durations, count_rows(result))
+                results.append(row)
+                print(f"  {name:<45}{row['median_seconds'] * 1000:>10.2f} ms{row['rows']:>10} rows")
+    finally:
+        db.close_connection()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "seed": args.seed,
+            "scales": scales,
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "in_memory_sets": args.in_memory_sets,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    json_path, csv_path = write_report(report, args.output_dir)
+    print(f"\nWrote {json_path} and {csv_path}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
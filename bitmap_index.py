@@ -0,0 +1,137 @@
+import numpy as np
+
+# A container holds the IDs sharing their upper bits; it switches from a sorted
+# array to a 65536-bit bitmap once it holds more than ARRAY_LIMIT values
+CONTAINER_BITS = 16
+LOW_MASK = (1 << CONTAINER_BITS) - 1
+ARRAY_LIMIT = 4096
+BITMAP_WORDS = (1 << CONTAINER_BITS) // 64
+
+
+def _to_bitmap(values):
+    words = np.zeros(BITMAP_WORDS, dtype=np.uint64)
+    values = values.astype(np.int64)
+    np.bitwise_or.at(words, values >> 6, np.left_shift(np.uint64(1), (values & 63).astype(np.uint64)))
+    return words
+
+
+def _to_array(words):
+    bits = np.unpackbits(words.view(np.uint8), bitorder="little")
+    return np.flatnonzero(bits).astype(np.uint16)
+
+
+def _test_bits(words, low):
+    low = low.astype(np.int64)
+    return ((words[low >> 6] >> (low & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+
+class RoaringBitmap:
+    """
+    Compressed set of non-negative integer IDs, in the style of a roaring bitmap.
+
+    IDs are split into a high key (``id >> 16``) and a 16-bit low part. Each
+    high key owns one container: a sorted uint16 array while it is sparse
+    (at most 4096 values, 8 KB worst case) and a fixed 8 KB bitmap once it is
+    dense. Membership is a dictionary lookup plus either a bit test or a
+    binary search in at most 4096 values.
+    """
+
+    def __init__(self):
+        self._containers = {}  # high key -> np.ndarray (uint16 array or uint64 bitmap words)
+
+    @classmethod
+    def from_sorted(cls, ids):
+        """Build a bitmap from a sorted array of unique IDs."""
+        bitmap = cls()
+        bitmap.add_many(ids)
+        return bitmap
+
+    @staticmethod
+    def _split(ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        ids = np.unique(ids[ids >= 0])
+        return ids >> CONTAINER_BITS, (ids & LOW_MASK).astype(np.uint16)
+
+    @staticmethod
+    def _groups(high):
+        keys, starts = np.unique(high, return_index=True)
+        ends = np.append(starts[1:], len(high))
+        return zip(keys.tolist(), starts, ends)
+
+    def add_many(self, ids):
+        high, low = self._split(ids)
+        for key, start, end in self._groups(high):
+            values = low[start:end]
+            container = self._containers.get(key)
+            if container is None:
+                merged = values
+            elif container.dtype == np.uint64:
+                self._containers[key] = container | _to_bitmap(values)
+                continue
+            else:
+                merged = np.union1d(container, values)
+            self._containers[key] = merged if len(merged) <= ARRAY_LIMIT else _to_bitmap(merged)
+
+    def remove_many(self, ids):
+        high, low = self._split(ids)
+        for key, start, end in self._groups(high):
+            container = self._containers.get(key)
+            if container is None:
+                continue
+            values = low[start:end]
+            if container.dtype == np.uint64:
+                remaining = _to_array(container & ~_to_bitmap(values))
+            else:
+                remaining = np.setdiff1d(container, values, assume_unique=True)
+            if not len(remaining):
+                del self._containers[key]
+            elif len(remaining) <= ARRAY_LIMIT:
+                self._containers[key] = remaining
+            else:
+                self._containers[key] = _to_bitmap(remaining)
+
+    def __contains__(self, vehicle_id):
+        if vehicle_id < 0:
+            return False
+        container = self._containers.get(vehicle_id >> CONTAINER_BITS)
+        if container is None:
+            return False
+        low = vehicle_id & LOW_MASK
+        if container.dtype == np.uint64:
+            return bool((int(container[low >> 6]) >> (low & 63)) & 1)
+        index = np.searchsorted(container, low)
+        return index < len(container) and container[index] == low
+
+    def contains_many(self, ids):
+        """Vectorized membership test: a boolean array with one entry per ID in ``ids``."""
+        ids = np.asarray(ids, dtype=np.int64)
+        found = np.zeros(len(ids), dtype=bool)
+        valid = ids >= 0
+        high = np.where(valid, ids >> CONTAINER_BITS, -1)
+        low = ids & LOW_MASK
+        for key in np.unique(high[valid]).tolist():
+            container = self._containers.get(key)
+            if container is None:
+                continue
+            mask = high == key
+            values = low[mask]
+            if container.dtype == np.uint64:
+                found[mask] = _test_bits(container, values)
+            else:
+                positions = np.minimum(np.searchsorted(container, values), len(container) - 1)
+                found[mask] = container[positions] == values
+        return found
+
+    def __len__(self):
+        return sum(int(np.unpackbits(c.view(np.uint8)).sum()) if c.dtype == np.uint64 else len(c)
+                   for c in self._containers.values())
+
+    def stats(self):
+        bitmaps = sum(1 for c in self._containers.values() if c.dtype == np.uint64)
+        return {
+            "containers": len(self._containers),
+            "bitmap_containers": bitmaps,
+            "array_containers": len(self._containers) - bitmaps,
+            "cardinality": len(self),
+            "bytes": sum(c.nbytes for c in self._containers.values()),
+        }
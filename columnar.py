@@ -0,0 +1,208 @@
+import datetime
+import functools
+from decimal import Decimal
+
+import numpy as np
+from mysql.connector import Error
+from mysql.connector.constants import FieldType
+
+from queries import QUERIES
+
+# NumPy dtype for each MySQL column type; anything not listed stays an object column
+_INTEGER_TYPES = {FieldType.TINY, FieldType.SHORT, FieldType.LONG, FieldType.LONGLONG,
+                  FieldType.INT24, FieldType.YEAR}
+_FLOAT_TYPES = {FieldType.DECIMAL, FieldType.NEWDECIMAL, FieldType.FLOAT, FieldType.DOUBLE}
+_DTYPES = {FieldType.DATE: "datetime64[D]",
+           FieldType.DATETIME: "datetime64[us]",
+           FieldType.TIMESTAMP: "datetime64[us]",
+           FieldType.TIME: "timedelta64[us]"}
+
+
+def _column_dtype(type_code):
+    if type_code in _INTEGER_TYPES:
+        return np.int64
+    if type_code in _FLOAT_TYPES:
+        return np.float64
+    return _DTYPES.get(type_code, object)
+
+
+def _value_dtype(values):
+    # Rows that did not come from a MySQL cursor: go by the first non-NULL value
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            return object
+        if isinstance(value, int):
+            return np.int64
+        if isinstance(value, (float, Decimal)):
+            return np.float64
+        if isinstance(value, datetime.datetime):
+            return "datetime64[us]"
+        if isinstance(value, datetime.date):
+            return "datetime64[D]"
+        return object
+    return object
+
+
+def _to_array(values, dtype):
+    try:
+        return np.array(values, dtype=dtype)
+    except (TypeError, ValueError):
+        # Integer columns with NULLs become floats with NaN; anything else stays as objects
+        if dtype is np.int64:
+            return _to_array(values, np.float64)
+        return np.array(values, dtype=object)
+
+
+class ColumnarResult:
+    """
+    Query result stored as one typed NumPy array per column.
+
+    Compared with a list of per-row dictionaries this needs no Python object
+    per row and no repeated key strings. It still behaves like a sequence of
+    rows for templates: ``len()``, indexing and iteration give lightweight row
+    views that support ``row["Column"]``, ``keys()`` and ``values()``.
+    """
+
+    def __init__(self, columns, arrays):
+        self.columns = list(columns)
+        self.arrays = arrays  # column name -> np.ndarray
+        self._length = len(arrays[self.columns[0]]) if self.columns else 0
+
+    @classmethod
+    def empty(cls, columns=()):
+        return cls(columns, {column: np.array([], dtype=object) for column in columns})
+
+    @classmethod
+    def from_cursor(cls, cursor, batch_size=10000):
+        """Build the column arrays from ``cursor.fetchmany`` batches, one batch at a time."""
+        columns = [description[0] for description in cursor.description]
+        dtypes = [_column_dtype(description[1]) for description in cursor.description]
+        chunks = [[] for _ in columns]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for index, values in enumerate(zip(*rows)):
+                chunks[index].append(_to_array(values, dtypes[index]))
+
+        arrays = {}
+        for column, dtype, parts in zip(columns, dtypes, chunks):
+            if not parts:
+                arrays[column] = np.array([], dtype=dtype)
+            elif len(parts) == 1:
+                arrays[column] = parts[0]
+            else:
+                arrays[column] = np.concatenate(parts)
+        return cls(columns, arrays)
+
+    @classmethod
+    def from_rows(cls, columns, rows):
+        """Build the column arrays from row tuples, typing each column by its values."""
+        columns = list(columns)
+        if not rows:
+            return cls.empty(columns)
+        arrays = {column: _to_array(values, _value_dtype(values))
+                  for column, values in zip(columns, zip(*rows))}
+        return cls(columns, arrays)
+
+    def __len__(self):
+        return self._length
+
+    def __bool__(self):
+        return self._length > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, str):
+            return self.arrays[index]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("row index out of range")
+        return ColumnarRow(self, index)
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield ColumnarRow(self, index)
+
+    def to_dataframe(self):
+        """Return the result as a pandas DataFrame (the column arrays are not copied)."""
+        import pandas as pd
+        return pd.DataFrame(self.arrays, columns=self.columns, copy=False)
+
+    def to_json_columns(self):
+        """Return ``{"columns": [...], "data": {column: [values]}}`` with JSON-safe values."""
+        data = {}
+        for column in self.columns:
+            array = self.arrays[column]
+            if array.dtype.kind == "M":
+                values = np.datetime_as_string(array).tolist()
+            elif array.dtype.kind in "mO":
+                values = [_json_value(value) for value in array.tolist()]
+            elif array.dtype.kind == "f":
+                values = [None if value != value else value for value in array.tolist()]  # NaN -> null
+            else:
+                values = array.tolist()
+            data[column] = values
+        return {"columns": self.columns, "data": data}
+
+
+def _json_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+class ColumnarRow:
+    """Read-only view of one row of a ColumnarResult."""
+
+    __slots__ = ("_result", "_index")
+
+    def __init__(self, result, index):
+        self._result = result
+        self._index = index
+
+    def __getitem__(self, column):
+        return self._result.arrays[column][self._index]
+
+    def keys(self):
+        return list(self._result.columns)
+
+    def values(self):
+        return [self._result.arrays[column][self._index] for column in self._result.columns]
+
+    def items(self):
+        return list(zip(self.keys(), self.values()))
+
+    def get(self, column, default=None):
+        if column in self._result.arrays:
+            return self[column]
+        return default
+
+
+def supports_columnar(params=None):
+    """
+    Let a query method return a ColumnarResult when called with ``columnar=True``.
+
+    The method's registered SQL in ``QUERIES`` is run directly into column
+    arrays; ``params`` maps the method's arguments to the statement's
+    parameters (no parameters by default). Only methods whose row fields
+    match the SQL column names should use this.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, columnar=False, **kwargs):
+            if not columnar:
+                return method(self, *args, **kwargs)
+            statement_params = params(*args, **kwargs) if params else ()
+            try:
+                return self.fetch_columnar(QUERIES[method.__name__], statement_params)
+            except Error as e:
+                print(f"Error executing columnar {method.__name__}: {e}")
+                return ColumnarResult.empty()
+
+        wrapper.supports_columnar = True
+        return wrapper
+
+    return decorator
@@ -0,0 +1,197 @@
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+# Dashboard datasets and the DatabaseManager method that produces each one.
+# The queries are independent, so they can run side by side on separate pooled connections.
+DASHBOARD_QUERIES = {
+    "total_accidents": "get_total_accidents",
+    "active_violations": "get_active_violations",
+    "cameras_operational": "get_operational_cameras",
+    "monthly_accidents": "get_monthly_accidents",
+    "violation_distribution": "get_violation_distribution",
+    "bubble_chart": "get_bubble_chart_data",
+    "total_violations": "get_total_violations",
+}
+
+# One shared executor for all page loads; threads are cheap to keep around
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(max_workers):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dashboard")
+        return _executor
+
+
+def _timed_call(method):
+    started = time.perf_counter()
+    result = method()
+    return result, time.perf_counter() - started
+
+
+def load_dashboard(db, max_workers=None):
+    """
+    Run all dashboard queries in parallel and return (data, timings).
+
+    ``data`` maps each key in DASHBOARD_QUERIES to its query result and
+    ``timings`` maps the same keys to the query's duration in seconds, plus a
+    ``total`` entry for the whole fan-out. The total is close to the slowest
+    single query as long as the connection pool has a connection per query.
+    """
+    max_workers = max_workers or min(len(DASHBOARD_QUERIES), db.pool.pool_size)
+    executor = _get_executor(max_workers)
+
+    started = time.perf_counter()
+    futures = {
+        key: executor.submit(_timed_call, getattr(db, method_name))
+        for key, method_name in DASHBOARD_QUERIES.items()
+    }
+
+    data, timings = {}, {}
+    for key, future in futures.items():
+        data[key], timings[key] = future.result()
+    timings["total"] = time.perf_counter() - started
+    return data, timings
+
+
+def format_timings(timings):
+    """Render per-query timings as a single log line, slowest query first."""
+    per_query = sorted(
+        ((key, seconds) for key, seconds in timings.items() if key != "total"),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    parts = ", ".join(f"{key}={seconds * 1000:.1f}ms" for key, seconds in per_query)
+    return f"Dashboard loaded in {timings['total'] * 1000:.1f}ms ({parts})"
+
+
+def dashboard_context(data):
+    """Template variables for index.html, derived from ``load_dashboard`` data."""
+    monthly_accidents = data["monthly_accidents"] or []
+    violation_distribution = data["violation_distribution"] or []
+    return {
+        "total_accidents": data["total_accidents"],
+        "total_violations": data["total_violations"],
+        "cameras_operational": data["cameras_operational"],
+        "monthly_accidents": [row["month"] for row in monthly_accidents],
+        "monthly_accidents_counts": [row["count"] for row in monthly_accidents],
+        "violation_distribution_labels": [row["ViolationType"] for row in violation_distribution],
+        "violation_distribution_counts": [row["count"] for row in violation_distribution],
+        "bubble_chart_data": data["bubble_chart"] or [],
+    }
+
+
+def _freeze(value):
+    # Lists become tuples and dicts read-only views, so a published snapshot cannot change
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class DashboardSnapshot(namedtuple("DashboardSnapshot", ["context", "timings", "built_at", "generation"])):
+    """One published dashboard: template variables, query timings and when it was built."""
+
+    __slots__ = ()
+
+    def age(self):
+        """Seconds since the snapshot was built."""
+        return max(0.0, time.time() - self.built_at)
+
+
+class DashboardRefresher:
+    """
+    Rebuild the dashboard in a background thread and serve the latest snapshot.
+
+    A snapshot is built every ``interval`` seconds, and ``debounce`` seconds
+    after a write to one of the dashboard's tables (a burst of writes causes
+    one rebuild, and read replicas get a moment to catch up). Readers get the current immutable DashboardSnapshot without
+    touching the database; publishing a new one is a single reference swap.
+    Writes made by other processes are picked up on the next interval.
+    """
+
+    def __init__(self, db, interval=30.0, debounce=1.0, refresh_on_write=True, max_workers=None):
+        self.db = db
+        self.interval = interval
+        self.debounce = debounce
+        self.max_workers = max_workers
+        self.tables = self._dashboard_tables(db)
+        self._snapshot = None
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.refreshes = 0
+        self.errors = 0
+        if refresh_on_write:
+            db.add_write_listener(self.notify_write)
+
+    @staticmethod
+    def _dashboard_tables(db):
+        """Tables the dashboard queries read (None when unknown: then every write counts)."""
+        tables = set()
+        for method_name in DASHBOARD_QUERIES.values():
+            method_tables = getattr(getattr(type(db), method_name, None), "cache_tables", None)
+            if method_tables is None:
+                return None
+            tables.update(method_tables)
+        return tables
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="dashboard-refresh", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def notify_write(self, tables):
+        """Schedule a rebuild if any of ``tables`` feeds the dashboard."""
+        if self.tables is None or self.tables.intersection(tables):
+            self._wake.set()
+
+    def refresh(self):
+        """Run the dashboard queries now and publish the result. Returns the new snapshot."""
+        data, timings = load_dashboard(self.db, self.max_workers)
+        previous = self._snapshot
+        snapshot = DashboardSnapshot(
+            context=_freeze(dashboard_context(data)),
+            timings=_freeze(timings),
+            built_at=time.time(),
+            generation=previous.generation + 1 if previous is not None else 1,
+        )
+        self._snapshot = snapshot
+        self.refreshes += 1
+        self._ready.set()
+        print(format_timings(timings))
+        return snapshot
+
+    def snapshot(self, timeout=None):
+        """The latest snapshot; waits up to ``timeout`` seconds for the first (None if still missing)."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            self._ready.wait(timeout)
+            snapshot = self._snapshot
+        return snapshot
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the previous snapshot
+                self.errors += 1
+                print(f"Error refreshing the dashboard: {e}")
+            woken = self._wake.wait(self.interval)
+            if woken and not self._stop.is_set():
+                # Let a burst of writes settle before rebuilding
+                self._stop.wait(self.debounce)
+            self._wake.clear()
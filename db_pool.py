@@ -0,0 +1,173 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import Error
+
+
+class PoolTimeoutError(Error):
+    """Raised when no pooled connection becomes free within the checkout timeout."""
+
+
+class ConnectionPool:
+    """A fixed-size, thread-safe pool of MySQL connections.
+
+    Connections are opened lazily up to ``pool_size`` and handed out one per
+    caller. A connection that sat idle for longer than ``health_check_idle``
+    seconds is pinged (and reconnected if needed) before it is handed out.
+    """
+
+    def __init__(self, pool_size=5, timeout=30.0, health_check_idle=30.0, **connect_args):
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1.")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.health_check_idle = health_check_idle
+        self.connect_args = connect_args
+
+        self._lock = threading.Condition()
+        self._idle = []  # Stack of (connection, returned_at) pairs
+        self._created = 0
+        self._in_use = 0
+        self._closed = False
+
+        # Statistics
+        self._checkouts = 0
+        self._timeouts = 0
+        self._reconnects = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _open(self):
+        connection = mysql.connector.connect(**self.connect_args)
+        # Plain reads must not pin an old snapshot on a long-lived connection,
+        # so every statement commits on its own unless a caller starts a transaction.
+        connection.autocommit = True
+        return connection
+
+    def _health_check(self, connection, idle_for):
+        """Make sure a connection taken from the idle stack is still usable."""
+        if idle_for < self.health_check_idle:
+            return connection
+        try:
+            connection.ping(reconnect=True, attempts=1, delay=0)
+            connection.autocommit = True
+            return connection
+        except Error:
+            with self._lock:
+                self._reconnects += 1
+            try:
+                connection.close()
+            except Error:
+                pass
+            return self._open()
+
+    def acquire(self, timeout=None):
+        """Borrow a connection, waiting up to ``timeout`` seconds for one to free up."""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        deadline = started + timeout if timeout is not None else None
+
+        with self._lock:
+            while not self._idle and self._created >= self.pool_size:
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        msg=f"No database connection available after {timeout:.1f}s "
+                            f"({self._in_use}/{self.pool_size} in use)."
+                    )
+                self._lock.wait(remaining)
+
+            if self._idle:
+                connection, returned_at = self._idle.pop()
+            else:
+                connection, returned_at = None, None
+                self._created += 1
+            self._in_use += 1
+
+            waited = time.perf_counter() - started
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        # Network work (connect/ping) happens outside the lock.
+        try:
+            if connection is None:
+                connection = self._open()
+            else:
+                connection = self._health_check(connection, time.monotonic() - returned_at)
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+                self._created -= 1
+                self._lock.notify()
+            raise
+        return connection
+
+    def release(self, connection, discard=False):
+        """Return a borrowed connection to the pool.
+
+        With ``discard=True`` the connection is closed instead of reused, e.g.
+        when a caller abandoned an unbuffered result set halfway through.
+        """
+        healthy = not discard
+        try:
+            # Never hand the next caller a half-finished transaction.
+            if healthy and connection.in_transaction:
+                connection.rollback()
+        except Error:
+            healthy = False
+
+        with self._lock:
+            self._in_use -= 1
+            keep = healthy and not self._closed
+            if keep:
+                self._idle.append((connection, time.monotonic()))
+            else:
+                self._created -= 1
+            self._lock.notify()
+
+        if not keep:
+            try:
+                connection.close()
+            except Error:
+                pass
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Context manager that borrows a connection and always returns it."""
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def stats(self):
+        """Return a snapshot of the pool's usage counters."""
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "reconnects": self._reconnects,
+                "wait_total_seconds": self._wait_total,
+                "wait_max_seconds": self._wait_max,
+                "wait_avg_seconds": self._wait_total / self._checkouts if self._checkouts else 0.0,
+            }
+
+    def close_all(self):
+        """Close every idle connection. Borrowed connections are closed when returned."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._closed = True
+        for connection, _ in idle:
+            try:
+                connection.close()
+            except Error:
+                pass
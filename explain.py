@@ -0,0 +1,54 @@
+from queries import QUERIES, SAMPLE_PARAMS
+
+
+def explain(db, sql, params=()):
+    """Traditional EXPLAIN output for one statement, one dictionary per plan step."""
+    statement = sql.strip().rstrip(";")
+    with db.get_cursor(dictionary=True) as cursor:
+        cursor.execute(f"EXPLAIN FORMAT=TRADITIONAL {statement}", tuple(params))
+        return cursor.fetchall()
+
+
+def explain_query(db, name):
+    """EXPLAIN the registered statement of a query method, with its sample parameters."""
+    return explain(db, QUERIES[name], SAMPLE_PARAMS.get(name, ()))
+
+
+def _text(value):
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode()
+    return value
+
+
+def plan_summary(steps):
+    """
+    The parts of a plan that decide whether it scales.
+
+    ``full_scans`` lists base tables read with access type ALL (derived and
+    union temporary tables are left out); ``estimated_rows`` is the sum of
+    the optimizer's row estimates over all steps.
+    """
+    full_scans, covering, step_names = [], [], []
+    filesort = temporary = False
+    estimated_rows = 0
+    for step in steps:
+        table = _text(step.get("table")) or ""
+        access = _text(step.get("type")) or ""
+        key = _text(step.get("key"))
+        extra = _text(step.get("Extra")) or ""
+        estimated_rows += int(step.get("rows") or 0)
+        filesort = filesort or "Using filesort" in extra
+        temporary = temporary or "Using temporary" in extra
+        if access == "ALL" and table and not table.startswith("<"):
+            full_scans.append(table)
+        if any(part.strip() == "Using index" for part in extra.split(";")):
+            covering.append(table)
+        step_names.append(f"{table or '-'}:{access or '-'}:{key or '-'}")
+    return {
+        "steps": step_names,
+        "full_scans": sorted(set(full_scans)),
+        "covering": sorted(set(covering)),
+        "filesort": filesort,
+        "temporary": temporary,
+        "estimated_rows": estimated_rows,
+    }
@@ -0,0 +1,90 @@
+"""
+Shared plumbing for the in-memory engines and the embedded analytics copy that
+answer DatabaseManager queries without going to MySQL.
+
+``fast_path(answer)`` puts one of them in front of a query method (each
+engine module defines its decorator this way, e.g. ``olap_cube_query``), and
+``Freshness`` tracks when an engine has to reload.
+"""
+import functools
+import time
+
+# Attempts at a load that keeps overlapping writes before falling back to SQL
+LOAD_ATTEMPTS = 3
+
+
+def fast_path(answer):
+    """
+    Try ``answer`` before a DatabaseManager query method.
+
+    ``answer(db, method_name, *args, columnar=False, **kwargs)`` returns the
+    method's result, or None when it cannot give one (engine disabled, not
+    loadable, or these arguments out of its reach); the decorated method
+    runs then, still getting ``columnar``. Fast paths stack: the outer one
+    is tried first.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, columnar=False, **kwargs):
+            result = answer(self, method.__name__, *args, columnar=columnar, **kwargs)
+            if result is not None:
+                return result
+            if columnar:
+                kwargs["columnar"] = True
+            return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class Freshness:
+    """
+    When an in-memory engine has to reload: after ``mark_stale`` or once ``max_age`` seconds old.
+
+    Every change the engine applies bumps ``generation`` (``changed``), so a
+    load can tell that a write landed while it was reading MySQL; such a
+    write may or may not be in what it read. The engine holds its own lock
+    around every call but ``due``.
+    """
+
+    def __init__(self, max_age=None):
+        self.max_age = max_age
+        self.generation = 0
+        self.stale = True
+        self._loaded_at = 0.0
+
+    def due(self):
+        """True when the engine should reload before answering (``ready`` returns its load())."""
+        expired = self.max_age is not None and time.monotonic() - self._loaded_at > self.max_age
+        return self.stale or expired
+
+    def changed(self):
+        self.generation += 1
+
+    def mark_stale(self):
+        self.changed()
+        self.stale = True
+
+    def loaded(self):
+        self._loaded_at = time.monotonic()
+        self.stale = False
+
+
+def load_unless_changed(freshness, lock, read, install):
+    """
+    Run ``read()`` and ``install`` its result under ``lock`` unless a change landed meanwhile.
+
+    Retries up to LOAD_ATTEMPTS times and returns whether a read got
+    installed; errors from ``read`` propagate.
+    """
+    for _ in range(LOAD_ATTEMPTS):
+        with lock:
+            generation = freshness.generation
+        data = read()
+        with lock:
+            if freshness.generation == generation:
+                install(data)
+                freshness.loaded()
+                return True
+    return False
@@ -0,0 +1,216 @@
+"""
+Secondary indexes for the join, filter and grouping columns of the analytics queries.
+
+Every index is declared once in INDEXES together with the query methods it
+serves. ``apply_indexes`` creates whatever is missing and rebuilds indexes
+whose columns differ from the declaration, so it can run on every deploy.
+Run it from the command line to see the EXPLAIN plans and timings of the
+affected queries before and after:
+
+    python index_migrations.py --database grp4-deliverable5
+    python index_migrations.py --database grp4-deliverable5 --dry-run
+    python index_migrations.py --database grp4-deliverable5 --drop   # undo, e.g. to compare again
+"""
+import argparse
+import statistics
+import time
+from collections import namedtuple
+
+from mysql.connector import Error
+
+from explain import explain_query, plan_summary
+from queries import QUERIES, SAMPLE_PARAMS
+
+IndexSpec = namedtuple("IndexSpec", ["name", "table", "columns", "queries"])
+
+# InnoDB secondary indexes also carry the primary key, so e.g. (RoadID, Date)
+# covers COUNT(AccidentID) grouped by road and date without touching the rows.
+INDEXES = (
+    IndexSpec("idx_accident_vehicle", "accident", ("VehicleID",),
+              ("set_operations_query", "set_membership_query", "union_query", "intersect_query",
+               "except_query", "difference_query", "symmetric_difference_query",
+               "vehicles_in_both_accidents_and_violations", "vehicles_in_only_accidents")),
+    IndexSpec("idx_accident_road_date", "accident", ("RoadID", "Date"),
+              ("running_total_accidents_per_road", "top_3_roads_with_most_accidents",
+               "percentage_contribution_of_accidents")),
+    IndexSpec("idx_accident_road_severity", "accident", ("RoadID", "Severity"),
+              ("get_bubble_chart_data",)),
+    IndexSpec("idx_accident_date", "accident", ("Date",),
+              ("get_monthly_accidents",)),
+    IndexSpec("idx_accident_severity", "accident", ("Severity",),
+              ("advanced_aggregate_query",)),
+    # The primary key (VehicleID, ViolationID) already serves lookups by VehicleID
+    IndexSpec("idx_vehicleviolation_violation", "vehicleviolation", ("ViolationID", "VehicleID"),
+              ("get_violation_distribution", "most_common_violation_types", "olap_query",
+               "subquery_with_clause")),
+    IndexSpec("idx_violation_type_fine", "violation", ("ViolationType", "FineAmount"),
+              ("set_comparison_query", "average_fine_per_violation_type", "partitioned_sum_of_fines",
+               "get_violation_distribution", "most_common_violation_types")),
+    IndexSpec("idx_violation_fine", "violation", ("FineAmount",),
+              ("users_and_vehicle_violations",)),
+)
+
+EXISTING_INDEXES_QUERY = """
+    SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME
+    FROM information_schema.STATISTICS
+    WHERE TABLE_SCHEMA = DATABASE()
+    ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX;
+"""
+
+
+def existing_indexes(db):
+    """``{(table, index name): (columns...)}`` for every index in the current database."""
+    indexes = {}
+    for table, index, column in db.run_query(EXISTING_INDEXES_QUERY):
+        key = (_text(table), _text(index))
+        indexes[key] = indexes.get(key, ()) + (_text(column),)
+    return indexes
+
+
+def _text(value):
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode()
+    return value
+
+
+def _column_list(columns):
+    return ", ".join(f"`{column}`" for column in columns)
+
+
+def planned_changes(db, indexes=INDEXES):
+    """The statements ``apply_indexes`` would run, as ``(spec, action, sql)`` tuples."""
+    existing = existing_indexes(db)
+    changes = []
+    for spec in indexes:
+        current = existing.get((spec.table, spec.name))
+        if current == tuple(spec.columns):
+            continue
+        if current is None:
+            action = "create"
+            sql = f"ALTER TABLE `{spec.table}` ADD INDEX `{spec.name}` ({_column_list(spec.columns)});"
+        else:
+            action = "rebuild"
+            sql = (f"ALTER TABLE `{spec.table}` DROP INDEX `{spec.name}`, "
+                   f"ADD INDEX `{spec.name}` ({_column_list(spec.columns)});")
+        changes.append((spec, action, sql))
+    return changes
+
+
+def apply_indexes(db, indexes=INDEXES, dry_run=False):
+    """
+    Bring the declared indexes up to date. Returns the applied ``(spec, action, sql)`` changes.
+
+    Indexes that already exist with the declared columns are left alone, so
+    running this repeatedly is safe.
+    """
+    changes = planned_changes(db, indexes)
+    if dry_run:
+        return changes
+    with db.get_cursor() as cursor:
+        for spec, action, sql in changes:
+            print(f"{action} {spec.table}.{spec.name} ({', '.join(spec.columns)})")
+            cursor.execute(sql)
+    if changes and db.cache is not None:
+        db.cache.clear()
+    return changes
+
+
+def drop_indexes(db, indexes=INDEXES):
+    """Remove the declared indexes that exist. Returns the names dropped."""
+    existing = existing_indexes(db)
+    dropped = []
+    with db.get_cursor() as cursor:
+        for spec in indexes:
+            if (spec.table, spec.name) not in existing:
+                continue
+            try:
+                cursor.execute(f"ALTER TABLE `{spec.table}` DROP INDEX `{spec.name}`;")
+                dropped.append(f"{spec.table}.{spec.name}")
+            except Error as e:
+                # e.g. the index is the only one left backing a foreign key
+                print(f"Error dropping index {spec.table}.{spec.name}: {e}")
+    return dropped
+
+
+def affected_queries(indexes=INDEXES):
+    names = []
+    for spec in indexes:
+        names.extend(name for name in spec.queries if name not in names)
+    return names
+
+
+def profile_queries(db, names, repeat=5):
+    """EXPLAIN summary and median run time of each named query."""
+    profile = {}
+    for name in names:
+        params = SAMPLE_PARAMS.get(name, ())
+        try:
+            summary = plan_summary(explain_query(db, name))
+            durations = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                db.run_query(QUERIES[name], params)
+                durations.append(time.perf_counter() - start)
+            summary["median_seconds"] = statistics.median(durations)
+        except Error as e:
+            summary = {"error": str(e)}
+        profile[name] = summary
+    return profile
+
+
+def print_comparison(before, after):
+    for name in before:
+        old, new = before[name], after.get(name, {})
+        print(f"\n{name}")
+        if "error" in old or "error" in new:
+            print(f"  error: {old.get('error') or new.get('error')}")
+            continue
+        for label, summary in (("before", old), ("after", new)):
+            flags = [flag for flag in ("filesort", "temporary") if summary[flag]]
+            print(f"  {label:<7}{summary['median_seconds'] * 1000:>9.2f} ms  "
+                  f"rows~{summary['estimated_rows']:<9} full scans: {', '.join(summary['full_scans']) or '-'}"
+                  f"{'  [' + ', '.join(flags) + ']' if flags else ''}")
+            print(f"         {' -> '.join(summary['steps'])}")
+
+
+def main():
+    from crud_flask import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Create the analytics indexes and compare query plans.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--database", default="grp4-deliverable5")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per query")
+    parser.add_argument("--dry-run", action="store_true", help="only print the statements that would run")
+    parser.add_argument("--drop", action="store_true", help="drop the declared indexes instead")
+    args = parser.parse_args()
+
+    db = DatabaseManager(host=args.host, user=args.user, password=args.password,
+                         database=args.database, cache_size=0)
+    try:
+        if args.drop:
+            print("Dropped: " + (", ".join(drop_indexes(db)) or "nothing"))
+            return
+        if args.dry_run:
+            for _, _, sql in apply_indexes(db, dry_run=True):
+                print(sql)
+            return
+        names = affected_queries()
+        before = profile_queries(db, names, args.repeat)
+        changes = apply_indexes(db)
+        if not changes:
+            print("All indexes are up to date.")
+        with db.get_cursor() as cursor:
+            # Refresh the optimizer's statistics so the new plans use the new indexes
+            for table in sorted({spec.table for spec in INDEXES}):
+                cursor.execute(f"ANALYZE TABLE `{table}`;")
+                cursor.fetchall()
+        after = profile_queries(db, names, args.repeat)
+        print_comparison(before, after)
+    finally:
+        db.close_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+from columnar import ColumnarResult
+
+# Latency histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Cumulative-on-render latency histogram with fixed bucket bounds."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+class CallStats:
+    """Latency, rows, bytes and errors recorded for one method or route."""
+
+    __slots__ = ("duration", "rows", "bytes", "errors", "statuses")
+
+    def __init__(self, buckets):
+        self.duration = Histogram(buckets)
+        self.rows = 0
+        self.bytes = 0
+        self.errors = 0
+        self.statuses = {}  # HTTP status -> count (routes only)
+
+
+class MetricsRegistry:
+    """
+    In-process metrics for DatabaseManager methods and Flask routes.
+
+    Each observation is a few integer updates under one lock, so the cost per
+    call stays in the low microseconds. ``render()`` produces the Prometheus
+    text exposition format; extra gauges and counters (pool and cache stats)
+    come from collectors registered with ``add_collector``.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._methods = {}  # method name -> CallStats
+        self._routes = {}  # (route, HTTP method) -> CallStats
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _stats(self, table, key):
+        stats = table.get(key)
+        if stats is None:
+            stats = table.setdefault(key, CallStats(self.buckets))
+        return stats
+
+    def record_call(self, name, seconds, rows=0, nbytes=0, error=False):
+        with self._lock:
+            stats = self._stats(self._methods, name)
+            stats.duration.observe(seconds)
+            stats.rows += rows
+            stats.bytes += nbytes
+            stats.errors += error
+
+    def record_request(self, route, http_method, status, seconds, nbytes=0):
+        with self._lock:
+            stats = self._stats(self._routes, (route, http_method))
+            stats.duration.observe(seconds)
+            stats.bytes += nbytes
+            stats.errors += status >= 500
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def add_collector(self, collector):
+        """Register a callable returning ``[(name, type, help, [(labels, value), ...]), ...]``."""
+        self._collectors.append(collector)
+
+    def render(self):
+        """Return every metric in the Prometheus text format."""
+        with self._lock:
+            methods = sorted(self._methods.items())
+            routes = sorted(self._routes.items())
+            lines = []
+            _histogram(lines, "db_method_duration_seconds", "DatabaseManager method latency.",
+                       [({"method": name}, stats.duration) for name, stats in methods])
+            _metric(lines, "db_method_rows_total", "counter", "Rows returned or affected by DatabaseManager methods.",
+                    [({"method": name}, stats.rows) for name, stats in methods])
+            _metric(lines, "db_method_bytes_total", "counter", "Estimated bytes fetched by DatabaseManager methods.",
+                    [({"method": name}, stats.bytes) for name, stats in methods])
+            _metric(lines, "db_method_errors_total", "counter", "DatabaseManager calls that hit a database error.",
+                    [({"method": name}, stats.errors) for name, stats in methods])
+
+            _histogram(lines, "http_request_duration_seconds", "Flask route latency.",
+                       [({"route": route, "http_method": verb}, stats.duration) for (route, verb), stats in routes])
+            _metric(lines, "http_requests_total", "counter", "Flask requests by route and status.",
+                    [({"route": route, "http_method": verb, "status": status}, count)
+                     for (route, verb), stats in routes for status, count in sorted(stats.statuses.items())])
+            _metric(lines, "http_response_bytes_total", "counter", "Response body bytes (streamed bodies excluded).",
+                    [({"route": route, "http_method": verb}, stats.bytes) for (route, verb), stats in routes])
+
+        for collector in self._collectors:
+            for name, metric_type, help_text, samples in collector():
+                _metric(lines, name, metric_type, help_text, samples)
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+def _metric(lines, name, metric_type, help_text, samples):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {metric_type}")
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+
+def _histogram(lines, name, help_text, samples):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, histogram in samples:
+        for bound, count in histogram.cumulative():
+            lines.append(f"{name}_bucket{_labels(dict(labels, le=_number(bound)))} {count}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.sum)}")
+        lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+
+def _value_bytes(value):
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    return 8
+
+
+def result_size(result):
+    """
+    Rows and estimated bytes of a DatabaseManager result.
+
+    Bytes are estimated from the first row times the row count (strings by
+    length, everything else as 8 bytes), which keeps the cost independent of
+    the result size.
+    """
+    if result is None:
+        return 0, 0
+    if isinstance(result, ColumnarResult):
+        return len(result), sum(array.nbytes for array in result.arrays.values())
+    affected_rows = getattr(result, "affected_rows", None)
+    if affected_rows is not None:
+        return affected_rows, 0
+    if isinstance(result, dict) and "records" in result:
+        result = result["records"]
+    if isinstance(result, list):
+        if not result:
+            return 0, 0
+        first = result[0]
+        values = first.values() if hasattr(first, "values") else first
+        if isinstance(values, (str, bytes)) or not hasattr(values, "__iter__"):
+            values = (values,)
+        return len(result), len(result) * sum(_value_bytes(value) for value in values)
+    if isinstance(result, bool):
+        return int(result), 0
+    return 1, _value_bytes(result)
+
+
+def instrument(db, registry, names):
+    """
+    Time the named methods of one DatabaseManager instance.
+
+    The wrappers are installed on the instance, so an instance created
+    without a registry runs the plain methods with no overhead at all.
+    A call counts as an error if it raised or if it hit a database error
+    that the method caught itself (tracked through ``db.error_count()``).
+    """
+    for name in names:
+        method = getattr(db, name, None)
+        if method is None:
+            continue
+        setattr(db, name, _timed(db, registry, name, method))
+
+
+def _timed(db, registry, name, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        errors = db.error_count()
+        start = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except Exception:
+            registry.record_call(name, time.perf_counter() - start, error=True)
+            raise
+        elapsed = time.perf_counter() - start
+        rows, nbytes = result_size(result)
+        registry.record_call(name, elapsed, rows, nbytes, db.error_count() != errors)
+        return result
+
+    return wrapper
+
+
+def database_collector(db):
+    """Collector exposing the connection pool and result cache counters of ``db``."""
+    def collect():
+        pool = db.pool_stats()
+        metrics = [
+            ("db_pool_size", "gauge", "Maximum number of pooled connections.", [({}, pool["pool_size"])]),
+            ("db_pool_in_use", "gauge", "Connections currently borrowed.", [({}, pool["in_use"])]),
+            ("db_pool_idle", "gauge", "Idle connections in the pool.", [({}, pool["idle"])]),
+            ("db_pool_checkouts_total", "counter", "Connections handed out.", [({}, pool["checkouts"])]),
+            ("db_pool_timeouts_total", "counter", "Borrowers that gave up waiting.", [({}, pool["timeouts"])]),
+            ("db_pool_reconnects_total", "counter", "Connections replaced after a failed health check.",
+             [({}, pool["reconnects"])]),
+            ("db_pool_wait_seconds_total", "counter", "Total time spent waiting for a connection.",
+             [({}, float(pool["wait_total_seconds"]))]),
+            ("db_pool_wait_seconds_max", "gauge", "Longest wait for a connection.",
+             [({}, float(pool["wait_max_seconds"]))]),
+        ]
+        cache = db.cache_stats()
+        if cache:
+            metrics += [
+                ("db_cache_entries", "gauge", "Cached query results.", [({}, cache["entries"])]),
+                ("db_cache_hits_total", "counter", "Result cache hits.", [({}, cache["hits"])]),
+                ("db_cache_misses_total", "counter", "Result cache misses.", [({}, cache["misses"])]),
+                ("db_cache_evictions_total", "counter", "Results evicted from the cache.", [({}, cache["evictions"])]),
+            ]
+        replicas = db.replica_stats()
+        if replicas:
+            def per_replica(value):
+                return [({"replica": replica["name"]}, value(replica)) for replica in replicas]
+
+            metrics += [
+                ("db_replica_up", "gauge", "Whether the replica is currently receiving reads.",
+                 per_replica(lambda replica: int(replica["up"]))),
+                ("db_replica_reads_total", "counter", "Reads served by the replica.",
+                 per_replica(lambda replica: replica["reads"])),
+                ("db_replica_errors_total", "counter", "Times the replica could not be reached.",
+                 per_replica(lambda replica: replica["errors"])),
+                ("db_replica_latency_seconds", "gauge", "Moving average of the replica's read duration.",
+                 per_replica(lambda replica: float(replica["latency_seconds"] or 0.0))),
+            ]
+        return metrics
+
+    return collect
+
+
+def init_app(app, registry):
+    """Time every Flask request and record it under its URL rule (e.g. ``/read/<table>``)."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop("_metrics_start", None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+            nbytes = 0 if response.is_streamed else (response.content_length or 0)
+            registry.record_request(route, request.method, response.status_code,
+                                    time.perf_counter() - start, nbytes)
+        return response
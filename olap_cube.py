@@ -0,0 +1,302 @@
+"""
+In-memory OLAP cubes over the accident and violation facts.
+
+Each fact is loaded with one GROUP BY into dense NumPy arrays with one axis
+per dimension and one array per measure:
+
+- ``accidents``: road x severity x month x vehicle_type, measure ``count``
+- ``violations``: violation_type x vehicle_type, measures ``count`` and ``fine_total``
+
+``OlapCubes.query`` answers slice (``where={"severity": "High"}``), dice
+(``where={"road": [1, 2, 3]}``), rollup (``group_by`` any subset of the
+dimensions, ``rollup=True`` adds WITH ROLLUP-style subtotal rows) and
+percentage-of-total (``percent=True``) queries with array reductions, so
+new dashboard breakdowns need no SQL:
+
+    columns, rows = db.olap_cubes.query("accidents", group_by=["month", "severity"],
+                                        where={"vehicle_type": ["Truck", "Bus"]}, percent=True)
+"""
+import functools
+import threading
+from collections import namedtuple
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+from mysql.connector import Error
+
+from columnar import ColumnarResult
+from fast_path import Freshness, fast_path, load_unless_changed
+from row_types import make_rows
+
+FactSpec = namedtuple("FactSpec", ["query", "dimensions", "measures", "tables"])
+
+FACTS = {
+    "accidents": FactSpec(
+        query="""
+            SELECT a.RoadID, a.Severity, CONCAT(YEAR(a.Date), '-', LPAD(MONTH(a.Date), 2, '0')),
+                   v.VehicleType, COUNT(*)
+            FROM accident a
+            LEFT JOIN vehicle v ON v.VehicleID = a.VehicleID
+            GROUP BY 1, 2, 3, 4;
+        """,
+        dimensions=("road", "severity", "month", "vehicle_type"),
+        measures=("count",),
+        tables=("accident", "vehicle", "road"),
+    ),
+    "violations": FactSpec(
+        query="""
+            SELECT v.ViolationType, vh.VehicleType, COUNT(*), SUM(v.FineAmount)
+            FROM vehicleviolation vv
+            JOIN violation v ON v.ViolationID = vv.ViolationID
+            LEFT JOIN vehicle vh ON vh.VehicleID = vv.VehicleID
+            GROUP BY 1, 2;
+        """,
+        dimensions=("violation_type", "vehicle_type"),
+        measures=("count", "fine_total"),
+        tables=("vehicleviolation", "violation", "vehicle"),
+    ),
+}
+
+ROAD_NAMES_QUERY = "SELECT RoadID, RoadName FROM road;"
+
+# Dimensions whose values are not strings (used to parse filters taken from a URL)
+DIMENSION_TYPES = {"road": int}
+
+# Percentages come back like MySQL's ROUND(..., 2): a DECIMAL rounded half away from zero
+PERCENT_STEP = Decimal("0.01")
+
+
+def _sort_key(value):
+    # NULL sorts first, like in MySQL
+    return (value is not None, value)
+
+
+class DenseCube:
+    """One fact's measures as dense arrays indexed by the sorted values of each dimension."""
+
+    def __init__(self, dimensions, measures, rows):
+        self.dimensions = tuple(dimensions)
+        self.measures = tuple(measures)
+        width = len(self.dimensions)
+        self.labels = [sorted({row[axis] for row in rows}, key=_sort_key) for axis in range(width)]
+        self._positions = [{value: index for index, value in enumerate(labels)} for labels in self.labels]
+        shape = tuple(len(labels) for labels in self.labels)
+        coordinates = tuple(np.array([positions[row[axis]] for row in rows], dtype=np.int64)
+                            for axis, positions in enumerate(self._positions))
+        self.arrays = {}
+        for offset, measure in enumerate(self.measures):
+            dtype = np.int64 if measure == "count" else np.float64
+            array = np.zeros(shape, dtype=dtype)
+            if rows:
+                values = [row[width + offset] if row[width + offset] is not None else 0 for row in rows]
+                np.add.at(array, coordinates, np.asarray(values, dtype=dtype))
+            self.arrays[measure] = array
+
+    def axis(self, dimension):
+        try:
+            return self.dimensions.index(dimension)
+        except ValueError:
+            raise ValueError(f"Unknown dimension '{dimension}', expected one of {', '.join(self.dimensions)}.")
+
+    def query(self, group_by=(), where=None, measure="count", percent=False, rollup=False):
+        """``(columns, rows)``: ``measure`` per combination of the ``group_by`` dimensions.
+
+        ``where`` maps dimensions to one value (slice) or a list of values
+        (dice). Combinations without any rows are left out, as in a GROUP BY.
+        """
+        if measure not in self.arrays:
+            raise ValueError(f"Unknown measure '{measure}', expected one of {', '.join(self.measures)}.")
+        group_axes = [self.axis(dimension) for dimension in group_by]
+        labels = list(self.labels)
+        values, counts = self.arrays[measure], self.arrays["count"]
+        for dimension, wanted in (where or {}).items():
+            axis = self.axis(dimension)
+            if not isinstance(wanted, (list, tuple, set, frozenset)):
+                wanted = [wanted]
+            indexes = [self._positions[axis][value] for value in wanted if value in self._positions[axis]]
+            values, counts = np.take(values, indexes, axis=axis), np.take(counts, indexes, axis=axis)
+            labels[axis] = [self.labels[axis][index] for index in indexes]
+
+        rows = []
+        total = values.sum()
+        levels = range(len(group_axes), -1, -1) if rollup else [len(group_axes)]
+        for level in levels:
+            kept = group_axes[:level]
+            rows.extend(self._grouped_rows(values, counts, labels, kept, len(group_axes)))
+        if rollup:
+            # WITH ROLLUP order: each group's subtotal right after its detail rows
+            rows.sort(key=lambda row: row[0])
+        rows = [row[1] for row in rows]
+
+        columns = list(group_by) + [measure]
+        if percent:
+            columns.append("percent")
+            rows = [row + (float(100.0 * row[-1] / total) if total else 0.0,) for row in rows]
+        return columns, rows
+
+    def _grouped_rows(self, values, counts, labels, kept, width):
+        """``(sort key, row)`` pairs for ``values`` summed down to the ``kept`` axes."""
+        dropped = tuple(axis for axis in range(values.ndim) if axis not in kept)
+        # Summing leaves the kept axes in cube order; put them in group_by order
+        permutation = [sorted(kept).index(axis) for axis in kept]
+        summed_values = np.transpose(values.sum(axis=dropped), permutation)
+        summed_counts = np.transpose(counts.sum(axis=dropped), permutation)
+        if kept:
+            cells = zip(*np.nonzero(summed_counts))
+        else:
+            cells = [()] if summed_counts > 0 else []
+
+        padding = width - len(kept)
+        pairs = []
+        for cell in cells:
+            group = tuple(labels[axis][index] for axis, index in zip(kept, cell))
+            # Rolled-up dimensions sort after every value of their group
+            sort_key = tuple(int(index) for index in cell) + (np.inf,) * padding
+            pairs.append((sort_key, group + (None,) * padding + (summed_values[cell].item(),)))
+        return pairs
+
+
+class OlapCubes:
+    """
+    The fact cubes of one DatabaseManager, reloaded after writes to their tables.
+
+    A write to one of a fact's tables (reported through the manager's write
+    listeners) marks that cube stale and it reloads on next use, discarding
+    a load that such a write overlapped; ``max_age`` forces a periodic reload
+    to pick up writes made by other processes.
+    """
+
+    def __init__(self, db, max_age=None):
+        self.db = db
+        self._cubes = {}
+        self._road_names = {}
+        self._freshness = {fact: Freshness(max_age) for fact in FACTS}
+        self._lock = threading.Lock()
+        db.add_write_listener(self._on_write)
+
+    def _on_write(self, tables):
+        with self._lock:
+            for fact, spec in FACTS.items():
+                if set(spec.tables).intersection(tables):
+                    self._freshness[fact].mark_stale()
+
+    def load(self, facts=None):
+        """(Re)load ``facts`` (all by default). Returns True on success."""
+        for fact in facts or FACTS:
+            try:
+                loaded = load_unless_changed(self._freshness[fact], self._lock, functools.partial(self._read, fact),
+                                             functools.partial(self._install, fact))
+            except Error as e:
+                print(f"Error loading OLAP cubes: {e}")
+                return False
+            if not loaded:
+                print(f"The {fact} tables kept changing while loading their cube; using SQL until the next attempt.")
+                return False
+        return True
+
+    def _read(self, fact):
+        spec = FACTS[fact]
+        # From the primary, so a reload right after a write sees it
+        with self.db.reading_from_primary():
+            road_names = dict(self.db.run_query(ROAD_NAMES_QUERY))
+            return road_names, DenseCube(spec.dimensions, spec.measures, self.db.run_query(spec.query))
+
+    def _install(self, fact, loaded):
+        self._road_names, self._cubes[fact] = loaded
+
+    def ready(self, fact):
+        """Make sure the ``fact`` cube is loaded and fresh; False means fall back to SQL."""
+        return self.load([fact]) if self._freshness[fact].due() else True
+
+    @staticmethod
+    def _check_fact(fact):
+        if fact not in FACTS:
+            raise ValueError(f"Unknown fact '{fact}', expected one of {', '.join(FACTS)}.")
+
+    def cube(self, fact):
+        self._check_fact(fact)
+        if not self.ready(fact):
+            raise Error(msg=f"The {fact} cube could not be loaded.")
+        with self._lock:
+            return self._cubes[fact]
+
+    def query(self, fact, group_by=(), where=None, measure="count", percent=False, rollup=False):
+        """Slice, dice, roll up or take percentages of one fact; returns ``(columns, rows)``."""
+        return self.cube(fact).query(group_by, where, measure, percent, rollup)
+
+    def road_names(self):
+        with self._lock:
+            return dict(self._road_names)
+
+    def parse_filters(self, fact, args):
+        """``where`` for ``query`` from string arguments, e.g. ``{"severity": "High,Fatal"}``."""
+        self._check_fact(fact)
+        where = {}
+        for dimension in FACTS[fact].dimensions:
+            raw = args.get(dimension)
+            if raw:
+                convert = DIMENSION_TYPES.get(dimension, str)
+                where[dimension] = [convert(value) for value in raw.split(",")]
+        return where
+
+
+# The dashboard and analytics queries the cubes can answer, with their SQL column names.
+# Each function returns the rows exactly as the SQL in queries.py would.
+
+def _advanced_aggregate(cubes):
+    return ("Severity", "AccidentCount"), cubes.query("accidents", ["severity"], rollup=True)[1]
+
+
+def _percentage_contribution(cubes):
+    # The SQL joins road, so accidents without a known road are left out
+    names = cubes.road_names()
+    _, rows = cubes.query("accidents", ["road"], where={"road": list(names)}, percent=True)
+    return (("RoadName", "TotalAccidents", "PercentageContribution"),
+            [(names[road], count, Decimal(percent).quantize(PERCENT_STEP, rounding=ROUND_HALF_UP))
+             for road, count, percent in rows])
+
+
+def _bubble_chart(cubes):
+    names = cubes.road_names()
+    _, rows = cubes.query("accidents", ["road", "severity"], where={"road": list(names)})
+    # Grouped by road name, like the SQL, so roads sharing a name are merged
+    merged = {}
+    for road, severity, count in rows:
+        key = (names[road], severity)
+        merged[key] = merged.get(key, 0) + count
+    ordered = sorted(merged, key=lambda key: (_sort_key(key[0]), _sort_key(key[1])))
+    return ("road_name", "severity", "accident_count"), [key + (merged[key],) for key in ordered]
+
+
+def _most_common_violation_types(cubes):
+    _, rows = cubes.query("violations", ["violation_type"])
+    return ("ViolationType", "ViolationCount"), sorted(rows, key=lambda row: row[1], reverse=True)
+
+
+CUBE_QUERIES = {
+    "advanced_aggregate_query": ("accidents", _advanced_aggregate),
+    "percentage_contribution_of_accidents": ("accidents", _percentage_contribution),
+    "get_bubble_chart_data": ("accidents", _bubble_chart),
+    "most_common_violation_types": ("violations", _most_common_violation_types),
+}
+
+
+def cube_rows(cubes, method_name):
+    """``(columns, rows)`` for a query in CUBE_QUERIES, or None when its cube is unavailable."""
+    fact, answer = CUBE_QUERIES[method_name]
+    if not cubes.ready(fact):
+        return None
+    return answer(cubes)
+
+
+def _cube_answer(db, method_name, columnar=False):
+    cubes = db.olap_cubes
+    answer = cube_rows(cubes, method_name) if cubes is not None else None
+    if answer is None:
+        return None
+    columns, rows = answer
+    return ColumnarResult.from_rows(columns, rows) if columnar else make_rows(columns, rows)
+
+
+# Answers a query in CUBE_QUERIES from the OLAP cubes unless they are disabled or cannot be loaded
+olap_cube_query = fast_path(_cube_answer)
@@ -0,0 +1,206 @@
+"""
+Catch query-plan regressions in the SQL that DatabaseManager runs.
+
+Every statement DatabaseManager issues is EXPLAINed and summarised (see
+explain.plan_summary): the registered analytics statements and their
+filtered variants, the per-table CRUD, bulk insert and keyset pagination
+statements, the accident series and the load queries of the schema registry
+and the in-memory engines. Statements with generated text are built by the
+same functions the code uses. ``--update`` stores the summaries as
+snapshots; a normal run compares against them and exits with status 1 when
+a plan got worse:
+
+- a base table is now fully scanned that was not before,
+- a filesort or temporary table appears,
+- the optimizer's row estimate grew by more than ``--max-row-growth`` times.
+
+Run it against a seeded database so the estimates are stable between runs:
+
+    python plan_check.py --database grp4-bench --load-scale 1 --update
+    python plan_check.py --database grp4-bench
+"""
+import argparse
+import json
+import os
+import sys
+
+from mysql.connector import Error
+
+from accident_cube import GRANULARITIES, LOAD_QUERY as ACCIDENT_CUBE_QUERY, series_sql
+from crud_flask import INSERT_COLUMNS, DatabaseManager, TABLES, insert_batch_sql, vehicle_ids_in_sql
+from explain import explain, plan_summary
+from olap_cube import FACTS, ROAD_NAMES_QUERY
+from queries import FILTERED_QUERIES, QUERIES, SAMPLE_FILTERED_PARAMS, SAMPLE_PARAMS
+from vehicle_sets import LOAD_QUERY, TRACKED_TABLES
+
+DEFAULT_SNAPSHOT_PATH = "plan_snapshots.json"
+
+# Row estimates below this are noise; growth is only judged above it
+MIN_ROWS_FOR_GROWTH = 1000
+
+
+# Sample values for the generated statements; EXPLAIN only needs them to be well-formed
+SAMPLE_VALUE = "1"
+SAMPLE_DATE = "2024-01-01"
+SAMPLE_BATCH_ROWS = 2
+SAMPLE_PAGE_LIMIT = 51  # read_page's default page size plus its look-ahead row
+
+
+def statements(db):
+    """``{name: (sql, params)}`` for every statement DatabaseManager issues."""
+    found = {name: (sql, SAMPLE_PARAMS.get(name, ())) for name, sql in QUERIES.items()}
+    found.update((f"{name}.filtered", (sql, SAMPLE_FILTERED_PARAMS[name])) for name, sql in FILTERED_QUERIES.items())
+    for table in TABLES:
+        plan = db.plans.plan(table)
+        key = plan.key_params((SAMPLE_VALUE,) * len(plan.key_columns) if plan.composite else SAMPLE_VALUE)
+        found[f"{table}.scan"] = (f"SELECT * FROM `{table}`;", ())
+        found[f"{table}.select"] = (plan.select_sql, key)
+        found[f"{table}.select_for_update"] = (plan.select_for_update_sql, key)
+        found[f"{table}.exists"] = (plan.exists_sql, key)
+        found[f"{table}.delete"] = (plan.delete_sql, key)
+
+        columns = INSERT_COLUMNS[table]
+        found[f"{table}.insert"] = (plan.insert_sql, (SAMPLE_VALUE,) * len(columns))
+        found[f"{table}.insert_batch"] = (insert_batch_sql(table, SAMPLE_BATCH_ROWS),
+                                          (SAMPLE_VALUE,) * len(columns) * SAMPLE_BATCH_ROWS)
+        updated = [column for column in columns if column not in plan.key_columns]
+        if updated:
+            found[f"{table}.update"] = (plan.update_sql(updated), (SAMPLE_VALUE,) * len(updated) + key)
+
+        # Keyset pages: the first page, then a seek past a boundary row by key and by another column
+        pk_columns = list(plan.key_columns)
+        pk_boundary = [SAMPLE_VALUE] * len(pk_columns)
+        found[f"{table}.page"] = db._page_query(table, pk_columns, None, False, None, SAMPLE_PAGE_LIMIT)
+        found[f"{table}.page.seek"] = db._page_query(table, pk_columns, None, False, pk_boundary,
+                                                     SAMPLE_PAGE_LIMIT)
+        if updated:
+            for descending in (False, True):
+                name = f"{table}.page.seek_by_{updated[0]}.{'desc' if descending else 'asc'}"
+                found[name] = db._page_query(table, pk_columns, updated[0], descending,
+                                             [SAMPLE_VALUE] + pk_boundary, SAMPLE_PAGE_LIMIT)
+    for table in TRACKED_TABLES:
+        found[f"vehicle_sets.load.{table}"] = (LOAD_QUERY.format(table=table), ())
+        found[f"set_membership_batch.{table}"] = (vehicle_ids_in_sql(table, SAMPLE_BATCH_ROWS),
+                                                  (SAMPLE_VALUE,) * SAMPLE_BATCH_ROWS)
+    for fact, spec in FACTS.items():
+        found[f"olap_cubes.load.{fact}"] = (spec.query, ())
+    found["olap_cubes.road_names"] = (ROAD_NAMES_QUERY, ())
+    found["accident_cube.load"] = (ACCIDENT_CUBE_QUERY, ())
+    for granularity in GRANULARITIES:
+        found[f"accident_series.{granularity}"] = series_sql(granularity)
+        found[f"accident_series.{granularity}.filtered"] = series_sql(granularity, SAMPLE_DATE, SAMPLE_DATE,
+                                                                      1, "High")
+    found["schema_registry.refresh"] = db.schema.statement()
+    return found
+
+
+def take_snapshots(db):
+    snapshots, errors = {}, {}
+    for name, (sql, params) in statements(db).items():
+        try:
+            summary = plan_summary(explain(db, sql, params))
+        except Error as e:
+            errors[name] = str(e)
+            continue
+        summary["sql"] = " ".join(sql.split())
+        snapshots[name] = summary
+    return snapshots, errors
+
+
+def regressions(old, new, max_row_growth=10.0):
+    """Reasons the plan ``new`` is worse than ``old`` (empty when it is not)."""
+    reasons = []
+    added_scans = sorted(set(new["full_scans"]) - set(old["full_scans"]))
+    if added_scans:
+        reasons.append(f"new full table scan on {', '.join(added_scans)}")
+    if new["filesort"] and not old["filesort"]:
+        reasons.append("now uses a filesort")
+    if new["temporary"] and not old["temporary"]:
+        reasons.append("now uses a temporary table")
+    old_rows, new_rows = old["estimated_rows"], new["estimated_rows"]
+    if new_rows >= MIN_ROWS_FOR_GROWTH and new_rows > max(old_rows, 1) * max_row_growth:
+        reasons.append(f"estimated rows grew from {old_rows} to {new_rows}")
+    return reasons
+
+
+def check(snapshots, current, max_row_growth=10.0):
+    """Compare current plans to the snapshots. Returns ``(regressed, added, removed)``."""
+    regressed = {}
+    for name, summary in current.items():
+        old = snapshots.get(name)
+        if old is None:
+            continue
+        reasons = regressions(old, summary, max_row_growth)
+        if reasons:
+            regressed[name] = reasons
+    added = sorted(set(current) - set(snapshots))
+    removed = sorted(set(snapshots) - set(current))
+    return regressed, added, removed
+
+
+def load_snapshots(path):
+    with open(path, encoding="utf-8") as snapshot_file:
+        return json.load(snapshot_file)["plans"]
+
+
+def save_snapshots(path, snapshots):
+    with open(path, "w", encoding="utf-8") as snapshot_file:
+        json.dump({"plans": snapshots}, snapshot_file, indent=2, sort_keys=True)
+        snapshot_file.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check DatabaseManager query plans against snapshots.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--database", default="grp4-bench")
+    parser.add_argument("--snapshots", default=DEFAULT_SNAPSHOT_PATH)
+    parser.add_argument("--update", action="store_true", help="write the current plans as the new snapshots")
+    parser.add_argument("--max-row-growth", type=float, default=10.0)
+    parser.add_argument("--load-scale", type=float,
+                        help="refill the database with benchmarks.datagen at this scale first")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    db = DatabaseManager(host=args.host, user=args.user, password=args.password,
+                         database=args.database, cache_size=0)
+    try:
+        if args.load_scale is not None:
+            from benchmarks import datagen
+            datagen.load(db, args.load_scale, args.seed)
+            with db.get_cursor() as cursor:
+                for table in datagen.LOAD_ORDER:
+                    cursor.execute(f"ANALYZE TABLE `{table}`;")
+                    cursor.fetchall()
+        current, errors = take_snapshots(db)
+    finally:
+        db.close_connection()
+
+    for name, error in sorted(errors.items()):
+        print(f"EXPLAIN failed for {name}: {error}")
+
+    if args.update or not os.path.exists(args.snapshots):
+        save_snapshots(args.snapshots, current)
+        print(f"Saved {len(current)} plan snapshots to {args.snapshots}.")
+        return 1 if errors else 0
+
+    snapshots = load_snapshots(args.snapshots)
+    regressed, added, removed = check(snapshots, current, args.max_row_growth)
+    for name in added:
+        print(f"new statement (no snapshot yet): {name}")
+    for name in removed:
+        print(f"statement no longer issued: {name}")
+    for name, reasons in sorted(regressed.items()):
+        print(f"REGRESSION {name}: {'; '.join(reasons)}")
+        print(f"  before: {' -> '.join(snapshots[name]['steps'])}")
+        print(f"  after:  {' -> '.join(current[name]['steps'])}")
+    if regressed or errors:
+        print(f"{len(regressed)} plan regression(s), {len(errors)} EXPLAIN error(s).")
+        return 1
+    print(f"{len(current)} plans checked, no regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+from mysql.connector import Error
+
+# Server error raised when a statement id is no longer known (e.g. after a reconnect)
+ER_UNKNOWN_STMT_HANDLER = 1243
+
+
+class PreparedStatementCache:
+    """
+    Server-side prepared statements, cached per pooled connection.
+
+    Each connection keeps up to ``max_statements`` prepared cursors in LRU
+    order, so a statement is parsed by the server once per connection instead
+    of once per call. A pooled connection is only ever used by one thread at
+    a time, so the per-connection caches need no locking of their own.
+    """
+
+    def __init__(self, max_statements=64):
+        self.max_statements = max_statements
+        # connection -> [connection_id, OrderedDict(sql -> (sql, cursor))]
+        self._connections = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.prepares = 0
+        self.reuses = 0
+        self.evictions = 0
+
+    def _statements(self, connection):
+        with self._lock:
+            entry = self._connections.get(connection)
+            if entry is None:
+                entry = self._connections[connection] = [connection.connection_id, OrderedDict()]
+        # A reconnect gives the connection a new server thread that has never
+        # seen our statements, so the old cursors are useless.
+        if entry[0] != connection.connection_id:
+            entry[0] = connection.connection_id
+            entry[1] = OrderedDict()
+        return entry[1]
+
+    def _cursor(self, connection, sql):
+        statements = self._statements(connection)
+        cached = statements.get(sql)
+        if cached is not None:
+            statements.move_to_end(sql)
+            self.reuses += 1
+            return cached
+
+        # Keep the statement string object: the cursor only skips re-preparing
+        # when it is handed the exact statement it prepared last time.
+        # Any trailing semicolon is dropped so the server prepares one bare statement.
+        statement = sql.strip().rstrip(";")
+        cached = (statement, connection.cursor(prepared=True))
+        statements[sql] = cached
+        self.prepares += 1
+        while len(statements) > self.max_statements:
+            _, (_, evicted) = statements.popitem(last=False)
+            self.evictions += 1
+            try:
+                evicted.close()
+            except Error:
+                pass
+        return cached
+
+    def execute(self, connection, sql, params=()):
+        """Execute ``sql`` as a prepared statement on ``connection`` and return the cursor.
+
+        The cursor belongs to the cache: read its results, but do not close it.
+        """
+        statement, cursor = self._cursor(connection, sql)
+        try:
+            cursor.execute(statement, params)
+        except Error as e:
+            if e.errno != ER_UNKNOWN_STMT_HANDLER:
+                raise
+            # The server forgot the statement; prepare it again once
+            self.discard(connection)
+            statement, cursor = self._cursor(connection, sql)
+            cursor.execute(statement, params)
+        return cursor
+
+    def discard(self, connection):
+        """Forget every statement prepared on ``connection``."""
+        with self._lock:
+            self._connections.pop(connection, None)
+
+    def stats(self):
+        with self._lock:
+            cached = sum(len(entry[1]) for entry in self._connections.values())
+        return {
+            "max_statements_per_connection": self.max_statements,
+            "cached_statements": cached,
+            "prepares": self.prepares,
+            "reuses": self.reuses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,231 @@
+# Fixed SQL behind every DatabaseManager query method, keyed by method name.
+# Keeping one registered text per query lets each pooled connection prepare it
+# once and reuse the server-side statement on every later call.
+
+QUERIES = {
+    "set_operations_query": """
+        (SELECT VehicleID FROM accident WHERE VehicleID IS NOT NULL)
+        UNION
+        (SELECT VehicleID FROM vehicleviolation WHERE VehicleID IS NOT NULL)
+        EXCEPT
+        (SELECT VehicleID FROM accident
+         INTERSECT
+         SELECT VehicleID FROM vehicleviolation)
+        ORDER BY VehicleID;
+    """,
+    "set_membership_query": """
+        SELECT CASE 
+            WHEN EXISTS (SELECT 1 FROM accident WHERE VehicleID = %s) AND 
+                 EXISTS (SELECT 1 FROM vehicleviolation WHERE VehicleID = %s)
+            THEN 'Yes'
+            ELSE 'No'
+        END AS InBothTables;
+    """,
+    "set_comparison_query": """
+        SELECT ViolationType, AVG(FineAmount) AS AvgFine
+        FROM violation
+        GROUP BY ViolationType
+        ORDER BY AvgFine DESC;
+    """,
+    "subquery_with_clause": """
+        WITH TotalFines AS (
+            SELECT VehicleID, SUM(FineAmount) AS TotalFine
+            FROM vehicleviolation
+            JOIN violation ON vehicleviolation.ViolationID = violation.ViolationID
+            GROUP BY VehicleID
+        )
+        SELECT VehicleID, TotalFine
+        FROM TotalFines
+        ORDER BY TotalFine DESC;
+    """,
+    "top_3_roads_with_most_accidents": """
+        WITH RoadAccidentCounts AS (
+            SELECT r.RoadID, r.RoadName, COUNT(a.AccidentID) AS AccidentCount
+            FROM road r
+            JOIN accident a ON r.RoadID = a.RoadID
+            GROUP BY r.RoadID, r.RoadName
+        )
+        SELECT RoadID, RoadName, AccidentCount
+        FROM RoadAccidentCounts
+        ORDER BY AccidentCount DESC
+        LIMIT 3;
+    """,
+    "users_and_vehicle_violations": """
+        WITH UserViolations AS (
+            SELECT 
+                u.UserID, u.UserName, v.VehicleID, vi.ViolationType, vi.FineAmount
+            FROM user u
+            JOIN vehicle v ON u.UserID = v.VehicleID
+            JOIN vehicleviolation vv ON v.VehicleID = vv.VehicleID
+            JOIN violation vi ON vv.ViolationID = vi.ViolationID
+            WHERE vi.FineAmount >= %s
+        )
+        SELECT UserID, UserName, VehicleID, ViolationType, FineAmount
+        FROM UserViolations
+        ORDER BY FineAmount DESC;
+    """,
+    "advanced_aggregate_query": """
+        SELECT Severity, COUNT(*) AS AccidentCount
+        FROM accident
+        GROUP BY Severity WITH ROLLUP;
+    """,
+    "average_fine_per_violation_type": """
+        SELECT ViolationType, AVG(FineAmount) AS AverageFine
+        FROM violation
+        GROUP BY ViolationType
+        ORDER BY AverageFine DESC;
+    """,
+    "running_total_accidents_per_road": """
+        SELECT 
+            r.RoadName, 
+            a.Date, 
+            COUNT(a.AccidentID) AS DailyAccidents,
+            SUM(COUNT(a.AccidentID)) OVER (PARTITION BY r.RoadID ORDER BY a.Date) AS RunningTotal
+        FROM road r
+        JOIN accident a ON r.RoadID = a.RoadID
+        GROUP BY r.RoadID, r.RoadName, a.Date
+        ORDER BY r.RoadName, a.Date;
+    """,
+    "olap_query": """
+        SELECT vehicleviolation.VehicleID, vehicleviolation.ViolationID, violation.FineAmount,
+               RANK() OVER (PARTITION BY vehicleviolation.VehicleID ORDER BY violation.FineAmount DESC) AS FineRank
+        FROM vehicleviolation
+        JOIN violation ON vehicleviolation.ViolationID = violation.ViolationID;
+    """,
+    "percentage_contribution_of_accidents": """
+        SELECT r.RoadName, COUNT(a.AccidentID) AS TotalAccidents,
+               ROUND(100.0 * COUNT(a.AccidentID) / SUM(COUNT(a.AccidentID)) OVER (), 2) AS PercentageContribution
+        FROM road r
+        JOIN accident a ON r.RoadID = a.RoadID
+        GROUP BY r.RoadID, r.RoadName;
+    """,
+    "partitioned_sum_of_fines": """
+        SELECT ViolationType, FineAmount,
+               SUM(FineAmount) OVER (PARTITION BY ViolationType) AS TotalFineByType
+        FROM violation;
+    """,
+    "get_total_accidents": "SELECT COUNT(*) FROM accident;",
+    "get_active_violations": "SELECT COUNT(*) FROM violation;",
+    "get_operational_cameras": "SELECT COUNT(*) FROM camera;",
+    "get_total_violations": "SELECT COUNT(*) FROM vehicleviolation;",
+    "get_total_vehicle_violations": "SELECT COUNT(*) AS count FROM vehicleviolation",
+    "get_monthly_accidents": """
+        SELECT MONTHNAME(Date) AS month, COUNT(*) AS count 
+        FROM accident 
+        GROUP BY MONTHNAME(Date), MONTH(Date)
+        ORDER BY MONTH(Date);
+    """,
+    "get_violation_distribution": """
+        SELECT ViolationType, COUNT(*) AS count 
+        FROM violation 
+        JOIN vehicleviolation ON violation.ViolationID = vehicleviolation.ViolationID 
+        GROUP BY ViolationType
+    """,
+    "get_bubble_chart_data": """
+        SELECT 
+        road.RoadName AS road_name,
+        accident.Severity AS severity,
+        COUNT(*) AS accident_count
+        FROM accident
+        JOIN road ON accident.RoadID = road.RoadID
+        GROUP BY road_name, severity
+        ORDER BY road_name, severity;
+    """,
+    "union_query": """
+        SELECT VehicleID FROM accident WHERE VehicleID IS NOT NULL
+        UNION
+        SELECT VehicleID FROM vehicleviolation WHERE VehicleID IS NOT NULL
+        ORDER BY VehicleID;
+    """,
+    "intersect_query": """
+        SELECT DISTINCT a.VehicleID
+        FROM accident a
+        INNER JOIN vehicleviolation vv ON a.VehicleID = vv.VehicleID
+        ORDER BY a.VehicleID;
+    """,
+    "except_query": """
+        SELECT DISTINCT a.VehicleID
+        FROM accident a
+        LEFT JOIN vehicleviolation vv ON a.VehicleID = vv.VehicleID
+        WHERE a.VehicleID IS NOT NULL AND vv.VehicleID IS NULL
+        ORDER BY a.VehicleID;
+    """,
+    "difference_query": """
+        SELECT DISTINCT vv.VehicleID
+        FROM vehicleviolation vv
+        LEFT JOIN accident a ON vv.VehicleID = a.VehicleID
+        WHERE vv.VehicleID IS NOT NULL AND a.VehicleID IS NULL
+        ORDER BY vv.VehicleID;
+    """,
+    "symmetric_difference_query": """
+        (SELECT VehicleID FROM accident
+        WHERE VehicleID NOT IN (SELECT VehicleID FROM vehicleviolation WHERE VehicleID IS NOT NULL))
+        UNION
+        (SELECT VehicleID FROM vehicleviolation
+        WHERE VehicleID NOT IN (SELECT VehicleID FROM accident WHERE VehicleID IS NOT NULL))
+        ORDER BY VehicleID;
+    """,
+    "vehicles_with_multiple_violations": """
+        SELECT VehicleID, COUNT(ViolationID) AS ViolationCount
+        FROM vehicleviolation
+        GROUP BY VehicleID
+        HAVING COUNT(ViolationID) > 1;
+    """,
+    "vehicles_with_no_violations": """
+        SELECT v.VehicleID, v.LicensePlate
+        FROM vehicle v
+        LEFT JOIN vehicleviolation vv ON v.VehicleID = vv.VehicleID
+        WHERE vv.VehicleID IS NULL;
+    """,
+    "most_common_violation_types": """
+        SELECT ViolationType, COUNT(vv.ViolationID) AS ViolationCount
+        FROM violation v
+        JOIN vehicleviolation vv ON v.ViolationID = vv.ViolationID
+        GROUP BY ViolationType
+        ORDER BY ViolationCount DESC;
+    """,
+    "vehicles_in_both_accidents_and_violations": """
+        SELECT DISTINCT a.VehicleID
+        FROM accident a
+        JOIN vehicleviolation vv ON a.VehicleID = vv.VehicleID
+        ORDER BY a.VehicleID;
+    """,
+    "vehicles_in_only_accidents": """
+        SELECT DISTINCT a.VehicleID
+        FROM accident a
+        LEFT JOIN vehicleviolation vv ON a.VehicleID = vv.VehicleID
+        WHERE a.VehicleID IS NOT NULL AND vv.VehicleID IS NULL
+        ORDER BY a.VehicleID;
+    """,
+}
+
+# Variants of QUERIES statements with the method's optional filters as parameters, run
+# when a filter is given. A NULL parameter leaves its filter off.
+FILTERED_QUERIES = {
+    # The window SUM runs after the WHERE, so the running total starts at the start date
+    "running_total_accidents_per_road": """
+        SELECT
+            r.RoadName,
+            a.Date,
+            COUNT(a.AccidentID) AS DailyAccidents,
+            SUM(COUNT(a.AccidentID)) OVER (PARTITION BY r.RoadID ORDER BY a.Date) AS RunningTotal
+        FROM road r
+        JOIN accident a ON r.RoadID = a.RoadID
+        WHERE (%s IS NULL OR a.RoadID = %s)
+          AND (%s IS NULL OR a.Date >= %s)
+          AND (%s IS NULL OR a.Date <= %s)
+        GROUP BY r.RoadID, r.RoadName, a.Date
+        ORDER BY r.RoadName, a.Date;
+    """,
+}
+
+# Example parameters for the statements that take any, for tools that run the
+# statements outside their methods (EXPLAIN, index migrations, plan checks)
+SAMPLE_PARAMS = {
+    "set_membership_query": (1, 1),
+    "users_and_vehicle_violations": (100,),
+}
+
+SAMPLE_FILTERED_PARAMS = {
+    "running_total_accidents_per_road": (1, 1, "2024-01-01", "2024-01-01", "2024-12-31", "2024-12-31"),
+}
@@ -0,0 +1,151 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueryCache:
+    """
+    Bounded LRU cache for query results, invalidated per table.
+
+    Every entry records the tables its query reads from. A write to a table
+    drops only the entries that depend on it; everything else stays warm.
+    Entries can also expire after ``ttl`` seconds, which bounds staleness when
+    another process writes to the same database.
+
+    Each table has a version that ``invalidate`` bumps. Callers take a
+    ``versions`` snapshot before running a query and pass it to ``put``, which
+    drops the result if one of its tables was invalidated meanwhile (the
+    query may have read the data from before the write).
+    """
+
+    def __init__(self, max_entries=256, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, tables, stored_at)
+        self._by_table = {}  # table -> set of keys
+        self._held = {}  # table -> monotonic time until which its results are not stored
+        self._versions = {}  # table -> number of invalidations so far
+        self._epoch = 0  # bumped by clear()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return (True, value) on a hit and (False, None) on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, _, stored_at = entry
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                self._remove(key)
+            self.misses += 1
+            return False, None
+
+    def versions(self, tables):
+        """Snapshot of the versions of ``tables``, to pass to ``put``."""
+        with self._lock:
+            return self._epoch, tuple(self._versions.get(table, 0) for table in sorted(tables))
+
+    def put(self, key, value, tables, versions=None):
+        with self._lock:
+            if versions is not None and versions != (
+                    self._epoch, tuple(self._versions.get(table, 0) for table in sorted(tables))):
+                return
+            now = time.monotonic()
+            if any(self._held.get(table, 0.0) > now for table in tables):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, tables, now)
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, tables, _ = self._entries.pop(key)
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+    def invalidate(self, table, hold=None):
+        """Drop every cached result that depends on ``table``.
+
+        With ``hold`` seconds, new results for ``table`` are not stored for that
+        long either, e.g. while read replicas may still be catching up on the write.
+        """
+        with self._lock:
+            self._versions[table] = self._versions.get(table, 0) + 1
+            if hold:
+                self._held[table] = time.monotonic() + hold
+            for key in list(self._by_table.get(table, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+            self._held.clear()
+            self._epoch += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def cached_query(*tables):
+    """
+    Cache a DatabaseManager method's result, keyed by method name and arguments.
+
+    ``tables`` lists the tables the query reads. Results of calls that hit a
+    database error are not cached, so a transient failure is never served
+    from the cache, and neither are results of calls that overlapped a write
+    to one of the tables.
+    """
+    tables = frozenset(tables)
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self.cache
+            if cache is None:
+                return method(self, *args, **kwargs)
+
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            hit, value = cache.get(key)
+            if hit:
+                return value
+
+            versions = cache.versions(tables)
+            errors_before = self.error_count()
+            value = method(self, *args, **kwargs)
+            if self.error_count() == errors_before:
+                cache.put(key, value, tables, versions)
+            return value
+
+        wrapper.cache_tables = tables
+        return wrapper
+
+    return decorator
@@ -0,0 +1,61 @@
+import functools
+from collections import namedtuple
+
+
+class RowMixin:
+    """
+    Dictionary-style access for named row tuples.
+
+    Rows keep the memory footprint of a plain tuple (no per-row ``__dict__``
+    and no per-row copies of the column names) but can still be used the way
+    the old per-row dictionaries were: ``row["Column"]``, ``row.Column``,
+    ``row.keys()``, ``row.values()`` and ``row.items()``.
+
+    Names are looked up in the class's ``_positions`` map of the original
+    column names, so columns that are not identifiers (renamed ``_0``, ``_1``
+    on the tuple) or clash with tuple methods (``count``, ``index``) work too.
+    """
+
+    __slots__ = ()
+    _columns = ()
+    _positions = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return tuple.__getitem__(self, self._positions[key])
+            except KeyError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def keys(self):
+        return self._columns
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(self._columns, self)
+
+    def get(self, key, default=None):
+        position = self._positions.get(key)
+        return default if position is None else tuple.__getitem__(self, position)
+
+    def to_dict(self):
+        return dict(zip(self._columns, self))
+
+
+@functools.lru_cache(maxsize=256)
+def row_type(columns, name="Row"):
+    """Return the row class for a column list, creating it on first use."""
+    base = namedtuple(name, columns, rename=True)
+    # A duplicated name resolves to its last column, like the dictionary cursor's rows did
+    positions = {column: position for position, column in enumerate(columns)}
+    return type(name, (RowMixin, base), {"__slots__": (), "_columns": tuple(columns), "_positions": positions})
+
+
+def make_rows(columns, rows):
+    """Wrap the tuples fetched for ``columns`` in the matching row class."""
+    row_class = row_type(tuple(columns))
+    make = functools.partial(tuple.__new__, row_class)
+    return list(map(make, rows))
@@ -0,0 +1,121 @@
+import threading
+from collections import namedtuple
+
+from mysql.connector import Error
+
+ColumnInfo = namedtuple("ColumnInfo", ["name", "data_type", "column_type", "nullable", "extra"])
+ForeignKey = namedtuple("ForeignKey", ["column", "referenced_table", "referenced_column"])
+
+
+class TableSchema:
+    """Columns, primary key and foreign keys of one table."""
+
+    def __init__(self, name):
+        self.name = name
+        self.columns = []  # ColumnInfo, in table order
+        self.primary_key = ()  # Column names, in key order
+        self.foreign_keys = []  # ForeignKey
+
+    @property
+    def column_names(self):
+        return [column.name for column in self.columns]
+
+
+class SchemaRegistry:
+    """
+    In-memory copy of the schema metadata for the application's tables.
+
+    All tables are loaded from ``information_schema`` with a single query, so
+    CRUD pages no longer need a ``SHOW COLUMNS`` round trip per request. Call
+    ``refresh()`` after a schema change to reload it.
+    """
+
+    QUERY = """
+    SELECT c.TABLE_NAME, c.COLUMN_NAME, c.DATA_TYPE, c.COLUMN_TYPE, c.IS_NULLABLE, c.EXTRA,
+           k.CONSTRAINT_NAME, k.ORDINAL_POSITION, k.REFERENCED_TABLE_NAME, k.REFERENCED_COLUMN_NAME
+    FROM information_schema.COLUMNS c
+    LEFT JOIN information_schema.KEY_COLUMN_USAGE k
+        ON k.TABLE_SCHEMA = c.TABLE_SCHEMA
+        AND k.TABLE_NAME = c.TABLE_NAME
+        AND k.COLUMN_NAME = c.COLUMN_NAME
+    WHERE c.TABLE_SCHEMA = DATABASE() AND c.TABLE_NAME IN ({placeholders})
+    ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION, k.ORDINAL_POSITION;
+    """
+
+    def __init__(self, db, tables):
+        self.db = db
+        self.tables = list(tables)
+        self._schemas = {}
+        self._lock = threading.Lock()
+
+    def statement(self):
+        """``(query, params)`` that loads the metadata of every table."""
+        return self.QUERY.format(placeholders=", ".join(["%s"] * len(self.tables))), tuple(self.tables)
+
+    def refresh(self):
+        """Reload metadata for every table. Returns True on success."""
+        query, params = self.statement()
+        try:
+            with self.db.reading_from_primary():
+                rows = self.db.run_query(query, params)
+        except Error as e:
+            # Keep serving the previous metadata (if any) rather than nothing
+            print(f"Error loading schema metadata: {e}")
+            return False
+
+        schemas = {}
+        primary_keys = {}  # table -> [(position, column)]
+        for (table, column, data_type, column_type, nullable, extra,
+             constraint, position, referenced_table, referenced_column) in rows:
+            # information_schema may hand back bytes on some server/connector versions
+            table, column = _text(table), _text(column)
+            schema = schemas.get(table)
+            if schema is None:
+                schema = schemas[table] = TableSchema(table)
+            # A column that belongs to several constraints appears once per constraint
+            if not schema.columns or schema.columns[-1].name != column:
+                schema.columns.append(ColumnInfo(column, _text(data_type), _text(column_type),
+                                                 _text(nullable) == "YES", _text(extra)))
+            if constraint is None:
+                continue
+            if _text(constraint) == "PRIMARY":
+                primary_keys.setdefault(table, []).append((position, column))
+            elif referenced_table is not None:
+                schema.foreign_keys.append(ForeignKey(column, _text(referenced_table), _text(referenced_column)))
+
+        for table, key_columns in primary_keys.items():
+            schemas[table].primary_key = tuple(column for _, column in sorted(key_columns))
+
+        with self._lock:
+            self._schemas = schemas
+        missing = set(self.tables) - set(schemas)
+        if missing:
+            print(f"Schema metadata missing for table(s): {', '.join(sorted(missing))}")
+        return True
+
+    def get(self, table):
+        """Return the TableSchema for ``table`` or None when it is unknown."""
+        return self._schemas.get(table)
+
+    def columns(self, table):
+        schema = self.get(table)
+        return schema.column_names if schema else None
+
+    def primary_key(self, table):
+        schema = self.get(table)
+        return schema.primary_key if schema and schema.primary_key else None
+
+    def referencing_tables(self, table):
+        """Tables that have a foreign key pointing at ``table``."""
+        return tuple(sorted(
+            schema.name for schema in self._schemas.values()
+            if any(fk.referenced_table == table for fk in schema.foreign_keys)
+        ))
+
+    @property
+    def loaded(self):
+        return bool(self._schemas)
+
+
+def _text(value):
+    return value.decode() if isinstance(value, (bytes, bytearray)) else value
@@ -0,0 +1,187 @@
+import itertools
+import json
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from mysql.connector import Error
+
+# Parameters kept per entry; bulk inserts can carry thousands
+MAX_LOGGED_PARAMS = 20
+
+# DatabaseManager helpers that are never reported as the calling method
+_HELPER_METHODS = {"run_query", "run_query_rows", "fetch_all", "fetch_single_value", "fetch_columnar",
+                   "wrapper", "_execute", "_run_prepared", "_log_if_slow", "_write_returning_row", "_fetch_row"}
+
+# Distinct statements waiting for an EXPLAIN at once; slow statements beyond
+# that are logged without a plan instead of queueing more work
+MAX_PENDING_EXPLAINS = 16
+
+# Only these statements can be explained
+_EXPLAINABLE = ("SELECT", "WITH", "(", "INSERT", "UPDATE", "DELETE", "REPLACE", "TABLE")
+
+
+def _json_params(params):
+    params = list(params or ())
+    values = [value if value is None or isinstance(value, (bool, int, float, str)) else str(value)
+              for value in params[:MAX_LOGGED_PARAMS]]
+    if len(params) > MAX_LOGGED_PARAMS:
+        values.append(f"... {len(params) - MAX_LOGGED_PARAMS} more")
+    return values
+
+
+def _calling_method(db):
+    """Name of the outermost public DatabaseManager method on the current stack."""
+    frame = sys._getframe(2)
+    name = None
+    while frame is not None:
+        if frame.f_locals.get("self") is db and frame.f_code.co_name not in _HELPER_METHODS:
+            name = frame.f_code.co_name
+        frame = frame.f_back
+    return name
+
+
+class SlowQueryLog:
+    """
+    Record DatabaseManager statements that take longer than ``threshold`` seconds.
+
+    The newest ``max_entries`` entries are kept in a ring buffer and, when
+    ``path`` is set, appended to a JSONL file. For each slow statement an
+    ``EXPLAIN FORMAT=JSON`` runs on a background thread and its plan is stored
+    with the entry; plans are remembered per SQL text so a statement that is
+    slow over and over is only explained once. Repeats of a statement whose
+    plan is still being fetched wait for that same EXPLAIN, and at most
+    ``MAX_PENDING_EXPLAINS`` distinct statements are queued at a time.
+    """
+
+    def __init__(self, db, threshold=0.5, max_entries=200, path=None, explain=True):
+        self.db = db
+        self.threshold = threshold
+        self.path = path
+        self.explain = explain
+        self._entries = deque(maxlen=max_entries)
+        self._plans = {}  # sql -> (plan, error)
+        self._pending = {}  # sql -> entries waiting for its EXPLAIN
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+
+    def observe(self, sql, params, seconds):
+        """Record the statement if it ran for at least ``threshold`` seconds."""
+        if seconds < self.threshold:
+            return
+        entry = {
+            "id": next(self._ids),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "method": _calling_method(self.db),
+            "duration_seconds": round(seconds, 6),
+            "sql": " ".join(sql.split()),
+            "params": _json_params(params),
+            "plan": None,
+            "plan_error": None,
+        }
+        key = entry["sql"]
+        submit = False
+        with self._lock:
+            self._entries.append(entry)
+            cached = self._plans.get(key) if self.explain else None
+            if cached is not None:
+                entry["plan"], entry["plan_error"] = cached
+            elif self.explain:
+                waiting = self._pending.get(key)
+                if waiting is not None and len(waiting) < self._entries.maxlen:
+                    waiting.append(entry)
+                    return
+                if waiting is None and len(self._pending) < MAX_PENDING_EXPLAINS:
+                    self._pending[key] = [entry]
+                    submit = True
+                else:
+                    entry["plan_error"] = "EXPLAIN queue full."
+        if submit:
+            self._executor.submit(self._explain, key, sql, params)
+        else:
+            self._write(entry)
+
+    def _explain(self, key, sql, params):
+        plan = self._run_explain(sql, params)
+        with self._lock:
+            if len(self._plans) >= self._entries.maxlen:
+                self._plans.clear()
+            self._plans[key] = plan
+            waiting = self._pending.pop(key, [])
+        for entry in waiting:
+            entry["plan"], entry["plan_error"] = plan
+            self._write(entry)
+
+    def _run_explain(self, sql, params):
+        statement = sql.strip().rstrip(";")
+        if not statement.upper().startswith(_EXPLAINABLE):
+            return None, "Statement cannot be explained."
+        try:
+            with self.db.get_cursor() as cursor:
+                cursor.execute(f"EXPLAIN FORMAT=JSON {statement}", tuple(params or ()))
+                rows = cursor.fetchall()
+            return (json.loads(rows[0][0]) if rows else None), None
+        except (Error, ValueError) as e:
+            return None, str(e)
+
+    def _write(self, entry):
+        if not self.path:
+            return
+        try:
+            with self._file_lock, open(self.path, "a", encoding="utf-8") as log_file:
+                log_file.write(json.dumps(entry, default=str) + "\n")
+        except OSError as e:
+            print(f"Error writing slow query log: {e}")
+
+    def entries(self, limit=None):
+        """Most recent entries first."""
+        with self._lock:
+            entries = list(self._entries)
+        entries.reverse()
+        return entries[:limit] if limit else entries
+
+    def worst(self, limit=20, sort="max"):
+        """
+        Slow statements grouped by method and SQL text, worst first.
+
+        ``sort`` is ``"max"`` (slowest single run), ``"total"`` (time spent
+        overall) or ``"count"`` (how often the statement was slow).
+        """
+        if sort not in ("max", "total", "count"):
+            raise ValueError("sort must be 'max', 'total' or 'count'.")
+        groups = {}
+        with self._lock:
+            entries = list(self._entries)
+        for entry in entries:
+            group = groups.get((entry["method"], entry["sql"]))
+            if group is None:
+                group = groups[(entry["method"], entry["sql"])] = {
+                    "method": entry["method"], "sql": entry["sql"], "count": 0,
+                    "total_seconds": 0.0, "max_seconds": 0.0, "params": entry["params"],
+                    "plan": None, "plan_error": None, "last_seen": None,
+                }
+            group["count"] += 1
+            group["total_seconds"] += entry["duration_seconds"]
+            if entry["duration_seconds"] >= group["max_seconds"]:
+                group["max_seconds"] = entry["duration_seconds"]
+                group["params"] = entry["params"]
+            group["plan"] = entry["plan"] or group["plan"]
+            group["plan_error"] = entry["plan_error"] or group["plan_error"]
+            group["last_seen"] = entry["timestamp"]
+
+        for group in groups.values():
+            group["avg_seconds"] = group["total_seconds"] / group["count"]
+        key = {"max": "max_seconds", "total": "total_seconds", "count": "count"}[sort]
+        return sorted(groups.values(), key=lambda group: group[key], reverse=True)[:limit]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._plans.clear()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
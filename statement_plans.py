@@ -0,0 +1,83 @@
+import threading
+
+# Upper bound on distinct UPDATE column sets remembered per table
+MAX_UPDATE_PLANS = 128
+
+
+class TablePlan:
+    """
+    Pre-built CRUD statement text for one table.
+
+    Everything that only depends on the table and its keys is generated once;
+    UPDATE statements are generated once per set of updated columns.
+    """
+
+    def __init__(self, table, primary_key, insert_sql=None):
+        self.table = table
+        self.key_columns = primary_key if isinstance(primary_key, tuple) else (primary_key,)
+        self.composite = len(self.key_columns) > 1
+
+        where_clause = " AND ".join(f"`{key}` = %s" for key in self.key_columns)
+        self.where_clause = where_clause
+        self.insert_sql = insert_sql
+        self.select_sql = f"SELECT * FROM `{table}` WHERE {where_clause};"
+        self.select_for_update_sql = f"SELECT * FROM `{table}` WHERE {where_clause} FOR UPDATE;"
+        self.exists_sql = f"SELECT COUNT(*) FROM `{table}` WHERE {where_clause};"
+        self.delete_sql = f"DELETE FROM `{table}` WHERE {where_clause};"
+        self._update_sql = {}
+        self._lock = threading.Lock()
+
+    def update_sql(self, columns):
+        """UPDATE statement setting ``columns`` (in the given order) for one primary key."""
+        columns = tuple(columns)
+        sql = self._update_sql.get(columns)
+        if sql is None:
+            set_clause = ", ".join(f"`{column}` = %s" for column in columns)
+            sql = f"UPDATE `{self.table}` SET {set_clause} WHERE {self.where_clause};"
+            with self._lock:
+                if len(self._update_sql) >= MAX_UPDATE_PLANS:
+                    self._update_sql.clear()
+                sql = self._update_sql.setdefault(columns, sql)
+        return sql
+
+    def key_params(self, primary_key_values):
+        """Turn a single key value or a sequence of composite key values into statement parameters."""
+        if self.composite:
+            # Forms submit composite keys as one comma-separated field, e.g. "3,7"
+            if isinstance(primary_key_values, str):
+                values = tuple(value.strip() for value in primary_key_values.split(","))
+            else:
+                values = tuple(primary_key_values)
+            if len(values) != len(self.key_columns):
+                raise ValueError(
+                    f"Table '{self.table}' needs {len(self.key_columns)} key values "
+                    f"({', '.join(self.key_columns)})."
+                )
+            return values
+        return (primary_key_values,)
+
+
+class StatementPlanner:
+    """Builds TablePlans on first use and serves them from memory afterwards."""
+
+    def __init__(self, db, insert_queries):
+        self.db = db
+        self.insert_queries = insert_queries
+        self._plans = {}
+        self._lock = threading.Lock()
+
+    def plan(self, table):
+        plan = self._plans.get(table)
+        if plan is None:
+            primary_key = self.db.primary_key(table)
+            if primary_key is None:
+                raise ValueError(f"Table '{table}' is not supported.")
+            plan = TablePlan(table, primary_key, self.insert_queries.get(table))
+            with self._lock:
+                plan = self._plans.setdefault(table, plan)
+        return plan
+
+    def reset(self):
+        """Drop all plans, e.g. after the schema registry was refreshed."""
+        with self._lock:
+            self._plans = {}
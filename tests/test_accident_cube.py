@@ -0,0 +1,45 @@
+import datetime
+import inspect
+
+import pytest
+
+from accident_cube import DailyAccidentCube, parse_date
+from crud_flask import DatabaseManager
+
+
+# The SQL body, without the cache, cube and analytics fast paths in front of it
+running_total = inspect.unwrap(DatabaseManager.running_total_accidents_per_road)
+
+
+class CubeManager:
+    def add_write_listener(self, listener):
+        pass
+
+
+class SQLOnlyManager:
+    def run_query_rows(self, query, params=()):
+        return [params]
+
+
+def test_parse_date_accepts_iso_dates_only():
+    assert parse_date("2024-03-05") == datetime.date(2024, 3, 5)
+    assert parse_date(None) is None
+    for value in ("2024-03", "2024-13-01", "yesterday"):
+        with pytest.raises(ValueError):
+            parse_date(value)
+
+
+@pytest.mark.parametrize("start", ["2024-03", "2024-02-30"])
+def test_cube_and_sql_reject_the_same_dates(start):
+    cube = DailyAccidentCube(CubeManager())
+    with pytest.raises(ValueError):
+        cube.covers(start)
+    with pytest.raises(ValueError):
+        cube.running_totals_result(start=start)
+    with pytest.raises(ValueError):
+        running_total(SQLOnlyManager(), start=start)
+
+
+def test_sql_path_passes_parsed_dates():
+    assert running_total(SQLOnlyManager(), road_id=2, end="2024-02-01") == [
+        (2, 2, None, None, datetime.date(2024, 2, 1), datetime.date(2024, 2, 1))]
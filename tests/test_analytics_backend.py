@@ -0,0 +1,95 @@
+import datetime
+import sqlite3
+from decimal import Decimal
+
+from analytics_backend import SQLiteBackend
+from query_cache import QueryCache
+from schema_registry import ColumnInfo, TableSchema
+
+TABLES = {
+    "accident": [("AccidentID", "int", "int", 1), ("Severity", "varchar", "varchar(20)", "High"),
+                 ("Date", "date", "date", datetime.date(2024, 1, 2)), ("RoadID", "int", "int", 1)],
+    "road": [("RoadID", "int", "int", 1), ("RoadName", "varchar", "varchar(50)", "Main")],
+    "violation": [("ViolationID", "int", "int", 1), ("ViolationType", "varchar", "varchar(50)", "Speeding"),
+                  ("FineAmount", "decimal", "decimal(10,2)", Decimal("100.50"))],
+    "vehicleviolation": [("VehicleID", "int", "int", 1), ("ViolationID", "int", "int", 1)],
+}
+
+
+class FakeSchema:
+    def get(self, table):
+        schema = TableSchema(table)
+        schema.columns = [ColumnInfo(name, data_type, column_type, True, "")
+                          for name, data_type, column_type, _ in TABLES[table]]
+        return schema
+
+
+class FakeManager:
+    def __init__(self):
+        self.cache = QueryCache()
+        self.schema = FakeSchema()
+
+    def get_columns(self, table):
+        return [name for name, _, _, _ in TABLES[table]]
+
+    def stream_records(self, table, batch_size=1000):
+        yield [tuple(value for _, _, _, value in TABLES[table])]
+
+
+def backend():
+    analytics = SQLiteBackend(sync_on_write=False)
+    analytics.attach(FakeManager())
+    return analytics
+
+
+def test_decimals_and_dates_come_back_as_mysql_types():
+    analytics = backend()
+    _, rows = analytics.query("partitioned_sum_of_fines")
+    assert rows == [("Speeding", Decimal("100.50"), Decimal("100.50"))]
+    assert all(isinstance(value, Decimal) for value in rows[0][1:])
+
+    _, rows = analytics.query("running_total_accidents_per_road")
+    assert rows == [("Main", datetime.date(2024, 1, 2), 1, Decimal("1"))]
+    analytics.close()
+
+
+def test_leaves_the_process_wide_sqlite_converters_alone():
+    converters = dict(sqlite3.converters)
+    backend().close()
+    assert sqlite3.converters == converters
+
+
+def test_copies_only_the_tables_of_methods_not_answered_elsewhere():
+    analytics = SQLiteBackend(sync_on_write=False)
+    analytics.attach(FakeManager(), skip={"advanced_aggregate_query", "running_total_accidents_per_road",
+                                          "percentage_contribution_of_accidents"})
+    assert analytics.tables == ["vehicleviolation", "violation"]
+    assert set(analytics._existing_tables()) == {"vehicleviolation", "violation"}
+    assert not analytics.supports("running_total_accidents_per_road")
+    assert analytics.supports("olap_query")
+    analytics.close()
+
+
+def test_engine_errors_fail_the_sync_and_leave_the_table_dirty():
+    analytics = backend()
+    manager = analytics.db
+    manager.stream_records = lambda table, batch_size=1000: iter([[(1,)]])  # too few columns for the copy
+    errors = analytics.sync_errors
+    assert analytics.sync(["violation"]) is False
+    assert analytics.sync_errors == errors + 1
+    assert "violation" in analytics.dirty_tables()
+    analytics.close()
+
+
+def test_a_failed_batch_is_rolled_back_so_the_next_sync_works():
+    analytics = backend()
+    manager = analytics.db
+    stream_records = manager.stream_records
+    manager.stream_records = lambda table, batch_size=1000: iter([[(1,)]])
+    assert analytics.sync(["violation"]) is False
+    assert not analytics.connection.in_transaction
+    manager.stream_records = stream_records
+    assert analytics.sync(["violation"]) is True
+    _, rows = analytics.query("partitioned_sum_of_fines")
+    assert rows == [("Speeding", Decimal("100.50"), Decimal("100.50"))]
+    analytics.close()
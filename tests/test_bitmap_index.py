@@ -0,0 +1,40 @@
+import numpy as np
+
+from bitmap_index import ARRAY_LIMIT, CONTAINER_BITS, RoaringBitmap
+
+
+def test_a_container_switches_to_a_bitmap_past_the_array_limit_and_back():
+    bitmap = RoaringBitmap.from_sorted(np.arange(ARRAY_LIMIT))
+    assert bitmap.stats()["array_containers"] == 1
+
+    bitmap.add_many([ARRAY_LIMIT])
+    assert bitmap.stats()["bitmap_containers"] == 1 and len(bitmap) == ARRAY_LIMIT + 1
+
+    bitmap.remove_many([0, 1])
+    stats = bitmap.stats()
+    assert stats["array_containers"] == 1 and stats["cardinality"] == ARRAY_LIMIT - 1
+    assert 0 not in bitmap and 2 in bitmap and ARRAY_LIMIT in bitmap
+
+
+def test_membership_spans_containers_and_ignores_negative_ids():
+    ids = [3, 70, (1 << CONTAINER_BITS) + 5, (5 << CONTAINER_BITS)]
+    bitmap = RoaringBitmap.from_sorted(ids + [-4])
+    assert len(bitmap) == 4 and bitmap.stats()["containers"] == 3
+    queries = ids + [4, -4, (2 << CONTAINER_BITS) + 3, (1 << CONTAINER_BITS) + 6]
+    expected = [True] * 4 + [False] * 4
+    assert bitmap.contains_many(queries).tolist() == expected
+    assert [vehicle_id in bitmap for vehicle_id in queries] == expected
+
+
+def test_dense_membership_matches_np_isin():
+    ids = np.random.default_rng(7).choice(3 << CONTAINER_BITS, size=20000, replace=False)
+    bitmap = RoaringBitmap.from_sorted(np.sort(ids))
+    assert bitmap.stats()["bitmap_containers"] == 3
+    queries = np.arange(0, 3 << CONTAINER_BITS, 7)
+    assert (bitmap.contains_many(queries) == np.isin(queries, ids)).all()
+
+
+def test_removing_every_id_drops_the_container():
+    bitmap = RoaringBitmap.from_sorted([1, 2, 3])
+    bitmap.remove_many([1, 2, 3, 99])
+    assert len(bitmap) == 0 and bitmap.stats()["containers"] == 0
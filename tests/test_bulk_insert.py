@@ -0,0 +1,113 @@
+from contextlib import contextmanager
+
+import pytest
+from mysql.connector import Error
+
+from crud_flask import DatabaseManager, insert_batch_sql
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+
+    def execute(self, query, params):
+        if "bad" in params:
+            raise Error(msg="Data too long for column 'RoadName'")
+        self.connection.statements.append((query, list(params)))
+        self.rowcount = query.count("(%s")
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+
+class VehicleSets:
+    def __init__(self):
+        self.inserted = []
+
+    def record_insert(self, table, vehicle_ids):
+        self.inserted.append((table, vehicle_ids))
+
+
+class Manager:
+    def __init__(self, vehicle_sets=None):
+        self.connection = FakeConnection()
+        self.vehicle_sets = vehicle_sets
+        self.accident_cube = None
+        self.invalidated = []
+
+    @contextmanager
+    def get_connection(self):
+        yield self.connection
+
+    def _log_if_slow(self, query, params, started):
+        pass
+
+    def invalidate_cache(self, *tables):
+        self.invalidated.extend(tables)
+
+
+def create_records(db, table, rows, **kwargs):
+    return DatabaseManager.create_records(db, table, rows, **kwargs)
+
+
+def road(name):
+    return {"RoadName": name, "RoadType": "Street", "NumLanes": 2}
+
+
+def test_insert_batch_sql():
+    assert insert_batch_sql("road", 2) == \
+        "INSERT INTO road (RoadName, RoadType, NumLanes) VALUES (%s, %s, %s), (%s, %s, %s);"
+
+
+def test_rows_go_out_batch_size_at_a_time_with_one_commit_each():
+    db = Manager()
+    rows = (road(f"Road {i}") for i in range(5))  # Any iterable, consumed lazily
+    results = create_records(db, "road", rows, batch_size=2)
+    assert [(r["rows"], r["inserted"], r["error"]) for r in results] == [(2, 2, None), (2, 2, None), (1, 1, None)]
+    assert db.connection.commits == 3
+    assert db.connection.statements[2] == (insert_batch_sql("road", 1), ["Road 4", "Street", 2])
+    assert db.invalidated == ["road"]
+
+
+def test_a_failed_batch_is_reported_and_the_rest_still_run():
+    db = Manager()
+    rows = [road("ok"), ("bad", "Street", 2), road("ok"), {"RoadName": "no type"}, ("too", "short")]
+    results = create_records(db, "road", rows, batch_size=1)
+    assert [r["inserted"] for r in results] == [1, 0, 1, 0, 0]
+    assert "Data too long" in results[1]["error"]
+    assert "missing column(s) RoadType, NumLanes" in results[3]["error"]
+    assert "Expected 3 values" in results[4]["error"]
+
+
+def test_stop_on_error():
+    db = Manager()
+    results = create_records(db, "road", [("bad", "Street", 2), road("never sent")], batch_size=1,
+                             stop_on_error=True)
+    assert len(results) == 1 and results[0]["error"]
+    assert db.connection.statements == [] and db.invalidated == []
+
+
+def test_inserted_vehicle_ids_reach_the_set_engine():
+    db = Manager(VehicleSets())
+    create_records(db, "vehicleviolation", [(7, 1), {"VehicleID": 9, "ViolationID": 2}])
+    assert db.vehicle_sets.inserted == [("vehicleviolation", [7, 9])]
+
+
+def test_unsupported_table_and_batch_size():
+    with pytest.raises(ValueError):
+        create_records(Manager(), "nosuch", [])
+    with pytest.raises(ValueError):
+        create_records(Manager(), "road", [], batch_size=0)
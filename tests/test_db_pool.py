@@ -0,0 +1,101 @@
+import mysql.connector
+import pytest
+from mysql.connector import Error
+
+import db_pool
+from db_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self, ping_error=None):
+        self.ping_error = ping_error
+        self.in_transaction = False
+        self.closed = False
+        self.pings = 0
+
+    def ping(self, reconnect, attempts, delay):
+        self.pings += 1
+        if self.ping_error:
+            raise self.ping_error
+
+    def rollback(self):
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    connections = []
+
+    def connect(**kwargs):
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    monkeypatch.setattr(mysql.connector, "connect", connect)
+    return connections
+
+
+def test_connections_are_opened_lazily_and_reused(opened):
+    pool = ConnectionPool(pool_size=2)
+    assert opened == []
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+    assert len(opened) == 1 and first.autocommit is True
+    assert pool.stats()["checkouts"] == 2
+
+
+def test_an_exhausted_pool_times_out(opened):
+    pool = ConnectionPool(pool_size=1, timeout=0.01)
+    held = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    stats = pool.stats()
+    assert stats["timeouts"] == 1 and stats["in_use"] == 1
+    pool.release(held)
+    assert pool.acquire() is held
+
+
+def test_release_rolls_back_an_open_transaction(opened):
+    pool = ConnectionPool(pool_size=1)
+    connection = pool.acquire()
+    connection.in_transaction = True
+    pool.release(connection)
+    assert connection.in_transaction is False and pool.stats()["idle"] == 1
+
+
+def test_a_discarded_connection_frees_its_slot(opened):
+    pool = ConnectionPool(pool_size=1, timeout=0.01)
+    connection = pool.acquire()
+    pool.release(connection, discard=True)
+    assert connection.closed and pool.stats()["created"] == 0
+    assert pool.acquire() is opened[1]
+
+
+def test_idle_connections_are_pinged_and_replaced_when_dead(opened):
+    pool = ConnectionPool(pool_size=1, health_check_idle=0)
+    connection = pool.acquire()
+    pool.release(connection)
+    assert pool.acquire() is connection and connection.pings == 1
+    pool.release(connection)
+
+    connection.ping_error = Error(msg="server has gone away")
+    replacement = pool.acquire()
+    assert replacement is opened[1] and connection.closed
+    assert pool.stats()["reconnects"] == 1
+
+
+def test_a_failed_connect_does_not_leak_a_slot(monkeypatch):
+    def connect(**kwargs):
+        raise Error(msg="access denied")
+
+    monkeypatch.setattr(db_pool.mysql.connector, "connect", connect)
+    pool = ConnectionPool(pool_size=1, timeout=0.01)
+    for _ in range(2):
+        with pytest.raises(Error) as raised:
+            pool.acquire()
+        assert not isinstance(raised.value, PoolTimeoutError)
+    assert pool.stats()["created"] == 0
@@ -0,0 +1,34 @@
+import threading
+
+from fast_path import LOAD_ATTEMPTS, Freshness, fast_path, load_unless_changed
+
+
+class Manager:
+    @fast_path(lambda db, method_name, columnar=False: ("fast", method_name, columnar) if db.enabled else None)
+    def query(self, columnar=False):
+        return ("sql", columnar)
+
+
+def test_falls_through_to_the_method_when_the_answer_is_none():
+    manager = Manager()
+    manager.enabled = True
+    assert manager.query(columnar=True) == ("fast", "query", True)
+    manager.enabled = False
+    assert manager.query(columnar=True) == ("sql", True)
+
+
+def test_load_overlapping_every_attempt_is_not_installed():
+    freshness, lock, installed, reads = Freshness(), threading.Lock(), [], []
+
+    def read():
+        reads.append(1)
+        freshness.changed()
+        return len(reads)
+
+    assert not load_unless_changed(freshness, lock, read, installed.append)
+    assert len(reads) == LOAD_ATTEMPTS and installed == [] and freshness.due()
+
+    assert load_unless_changed(freshness, lock, lambda: "rows", installed.append)
+    assert installed == ["rows"] and not freshness.due()
+    freshness.mark_stale()
+    assert freshness.due()
@@ -0,0 +1,52 @@
+import sqlite3
+
+import pytest
+
+from crud_flask import DatabaseManager
+
+# SQLite orders NULLs like MySQL (first ascending, last descending), so the
+# generated seek queries can be paged through an in-memory table
+ROWS = [(1, 30), (2, None), (3, 10), (4, None), (5, 30), (6, 20), (7, None)]
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE road (RoadID INTEGER PRIMARY KEY, Speed INTEGER)")
+    connection.executemany("INSERT INTO road VALUES (?, ?)", ROWS)
+    return connection
+
+
+def pages(connection, sort_column, descending, page_size):
+    """Every row, one seek query per page, the way list_records walks them."""
+    seen, boundary = [], None
+    for _ in range(len(ROWS) + 1):
+        query, params = DatabaseManager._page_query("road", ["RoadID"], sort_column, descending,
+                                                    boundary, page_size)
+        page = connection.execute(query.replace("%s", "?"), params).fetchall()
+        seen.extend(page)
+        if len(page) < page_size:
+            return seen
+        last = page[-1]
+        boundary = [last[1], last[0]] if sort_column else [last[0]]
+    raise AssertionError(f"paging did not finish, stuck after {seen}")
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("page_size", [1, 2, 3])
+def test_paging_over_null_sort_values_visits_every_row_once_in_order(connection, descending, page_size):
+    order = "DESC" if descending else "ASC"
+    expected = connection.execute(f"SELECT * FROM road ORDER BY Speed {order}, RoadID {order}").fetchall()
+    assert pages(connection, "Speed", descending, page_size) == expected
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_paging_by_primary_key_alone(connection, descending):
+    expected = sorted(ROWS, reverse=descending)
+    assert pages(connection, None, descending, 2) == expected
+
+
+def test_a_null_boundary_only_continues_past_its_key():
+    clause, params = DatabaseManager._seek_clause("Speed", ["RoadID"], [None, 4], descending=False)
+    assert clause == "WHERE (`Speed` IS NULL AND (`RoadID`) > (%s)) OR `Speed` IS NOT NULL"
+    assert params == [4]
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from columnar import ColumnarResult
+from metrics import MetricsRegistry, instrument, result_size
+from row_types import make_rows
+
+
+@pytest.mark.parametrize("result, expected", [
+    (None, (0, 0)),
+    ([], (0, 0)),
+    # Bytes come from the first row: strings by length, anything else as 8
+    (make_rows(("Name", "Count"), [("Main", 3), ("Elm Street", 1)]), (2, 2 * (4 + 8))),
+    ([{"Name": None, "Count": 1}], (1, 8)),
+    ([(1,), (2,), (3,)], (3, 24)),
+    (["ab", "cd"], (2, 4)),
+    ({"records": [(1, "x")], "next_token": None}, (1, 9)),
+    (SimpleNamespace(affected_rows=5), (5, 0)),
+    (True, (1, 0)),
+    (False, (0, 0)),
+    (42, (1, 8)),
+    ("abc", (1, 3)),
+])
+def test_result_size(result, expected):
+    assert result_size(result) == expected
+
+
+def test_result_size_of_a_columnar_result():
+    result = ColumnarResult(["VehicleID"], {"VehicleID": np.arange(4, dtype=np.int64)})
+    assert result_size(result) == (4, 32)
+
+
+def test_render_uses_the_prometheus_text_format():
+    registry = MetricsRegistry(buckets=(0.01, 0.1))
+    registry.record_call("read_record", 0.005, rows=1, nbytes=40)
+    registry.record_call("read_record", 0.05, error=True)
+    registry.record_request('/read/<table>', "GET", 200, 0.2, nbytes=100)
+    registry.record_request('/read/<table>', "GET", 500, 0.001)
+    registry.add_collector(lambda: [("db_pool_in_use", "gauge", "Connections currently borrowed.",
+                                     [({"pool": 'say "hi"\n'}, 2)])])
+    lines = registry.render().splitlines()
+
+    assert "# TYPE db_method_duration_seconds histogram" in lines
+    assert lines[lines.index("# TYPE db_method_duration_seconds histogram") + 1:][:5] == [
+        'db_method_duration_seconds_bucket{method="read_record",le="0.01"} 1',
+        'db_method_duration_seconds_bucket{method="read_record",le="0.1"} 2',
+        'db_method_duration_seconds_bucket{method="read_record",le="+Inf"} 2',
+        'db_method_duration_seconds_sum{method="read_record"} 0.055',
+        'db_method_duration_seconds_count{method="read_record"} 2',
+    ]
+    assert 'db_method_rows_total{method="read_record"} 1' in lines
+    assert 'db_method_errors_total{method="read_record"} 1' in lines
+    assert 'http_requests_total{route="/read/<table>",http_method="GET",status="200"} 1' in lines
+    assert 'http_requests_total{route="/read/<table>",http_method="GET",status="500"} 1' in lines
+    assert 'http_response_bytes_total{route="/read/<table>",http_method="GET"} 100' in lines
+    assert 'db_pool_in_use{pool="say \\"hi\\"\\n"} 2' in lines
+
+
+class Manager:
+    def __init__(self):
+        self.errors = 0
+
+    def error_count(self):
+        return self.errors
+
+    def read_page(self, table):
+        return {"records": [(1, "a")]}
+
+    def read_record(self, table):
+        # Like the real methods: the database error is caught and reported through error_count()
+        self.errors += 1
+        return None
+
+
+def test_instrument_counts_caught_database_errors():
+    db, registry = Manager(), MetricsRegistry()
+    instrument(db, registry, ["read_page", "read_record", "missing_method"])
+    assert db.read_page("road") == {"records": [(1, "a")]}
+    db.read_record("road")
+    text = registry.render()
+    assert 'db_method_rows_total{method="read_page"} 1' in text
+    assert 'db_method_bytes_total{method="read_page"} 9' in text
+    assert 'db_method_errors_total{method="read_record"} 1' in text
+    assert 'db_method_errors_total{method="read_page"} 0' in text
@@ -0,0 +1,77 @@
+from decimal import Decimal
+
+import pytest
+
+from olap_cube import DenseCube, _percentage_contribution
+
+# road x severity x count, as the GROUP BY would return it
+ROWS = [
+    (2, "High", 3),
+    (1, "Low", 1),
+    (1, "High", 2),
+    (2, None, 4),
+]
+
+
+@pytest.fixture
+def cube():
+    return DenseCube(("road", "severity"), ("count",), ROWS)
+
+
+def test_group_by_follows_the_requested_dimension_order(cube):
+    columns, rows = cube.query(["severity", "road"])
+    assert columns == ["severity", "road", "count"]
+    # NULL sorts first, and empty combinations are left out
+    assert rows == [(None, 2, 4), ("High", 1, 2), ("High", 2, 3), ("Low", 1, 1)]
+
+
+def test_rollup_puts_each_subtotal_after_its_group(cube):
+    _, rows = cube.query(["road", "severity"], rollup=True)
+    assert rows == [
+        (1, "High", 2), (1, "Low", 1), (1, None, 3),
+        (2, None, 4), (2, "High", 3), (2, None, 7),
+        (None, None, 10),
+    ]
+
+
+def test_slice_and_dice(cube):
+    assert cube.query(["road"], where={"severity": "High"})[1] == [(1, 2), (2, 3)]
+    assert cube.query([], where={"road": [2, 99]})[1] == [(7,)]
+    assert cube.query([], where={"road": 99})[1] == []
+
+
+def test_percent_is_of_the_filtered_total(cube):
+    columns, rows = cube.query(["road"], where={"severity": ["High", "Low"]}, percent=True)
+    assert columns == ["road", "count", "percent"]
+    assert rows == [(1, 3, 50.0), (2, 3, 50.0)]
+
+
+def test_unknown_dimension_or_measure(cube):
+    with pytest.raises(ValueError):
+        cube.query(["month"])
+    with pytest.raises(ValueError):
+        cube.query(["road"], measure="fine_total")
+
+
+def test_sum_measures_treat_null_as_zero():
+    cube = DenseCube(("violation_type",), ("count", "fine_total"), [("Speeding", 2, 150.0), ("Parking", 1, None)])
+    assert cube.query(["violation_type"], measure="fine_total")[1] == [("Parking", 0.0), ("Speeding", 150.0)]
+
+
+class Cubes:
+    def __init__(self, cube):
+        self.cube = cube
+
+    def road_names(self):
+        return {1: "Main St", 2: "Elm St"}
+
+    def query(self, fact, group_by, where=None, percent=False):
+        return self.cube.query(group_by, where, percent=percent)
+
+
+def test_percentage_contribution_rounds_like_mysql():
+    cube = DenseCube(("road", "severity"), ("count",), [(1, "Low", 1), (2, "Low", 2), (3, "Low", 5)])
+    columns, rows = _percentage_contribution(Cubes(cube))
+    assert columns == ("RoadName", "TotalAccidents", "PercentageContribution")
+    # Road 3 has no name, so it is left out like the SQL join leaves it out
+    assert rows == [("Main St", 1, Decimal("33.33")), ("Elm St", 2, Decimal("66.67"))]
@@ -0,0 +1,57 @@
+from query_cache import QueryCache, cached_query
+
+
+class FakeManager:
+    def __init__(self):
+        self.cache = QueryCache()
+        self.calls = 0
+        self.write_during_query = False
+
+    def error_count(self):
+        return 0
+
+    @cached_query("accident")
+    def count_accidents(self):
+        self.calls += 1
+        if self.write_during_query:
+            # A write to the table lands after the query read it, before the result is stored
+            self.cache.invalidate("accident")
+        return self.calls
+
+
+def test_result_is_cached():
+    db = FakeManager()
+    assert db.count_accidents() == 1
+    assert db.count_accidents() == 1
+    assert db.calls == 1
+
+
+def test_invalidate_during_query_is_not_lost():
+    db = FakeManager()
+    db.write_during_query = True
+    assert db.count_accidents() == 1
+    db.write_during_query = False
+    # The first result predates the write, so it must not have been cached
+    assert db.count_accidents() == 2
+    assert db.count_accidents() == 2
+
+
+def test_put_with_outdated_versions_is_dropped():
+    cache = QueryCache()
+    versions = cache.versions({"road"})
+    cache.invalidate("road")
+    cache.put("key", "stale", {"road"}, versions)
+    assert cache.get("key") == (False, None)
+
+    versions = cache.versions({"road"})
+    cache.invalidate("accident")
+    cache.put("key", "fresh", {"road"}, versions)
+    assert cache.get("key") == (True, "fresh")
+
+
+def test_clear_drops_in_flight_results():
+    cache = QueryCache()
+    versions = cache.versions({"road"})
+    cache.clear()
+    cache.put("key", "stale", {"road"}, versions)
+    assert cache.get("key") == (False, None)
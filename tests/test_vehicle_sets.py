@@ -0,0 +1,68 @@
+from contextlib import contextmanager
+
+from vehicle_sets import VehicleIdSet, VehicleSetEngine
+
+LOADED = {
+    "accident": [(1, 2), (2, 1), (4, 1)],
+    "vehicleviolation": [(2, 3), (3, 1), (4, 1)],
+}
+
+
+class Manager:
+    def __init__(self):
+        self.queries = 0
+
+    @contextmanager
+    def reading_from_primary(self):
+        yield
+
+    def run_query(self, query, params=None):
+        self.queries += 1
+        table = "vehicleviolation" if "vehicleviolation" in query else "accident"
+        return LOADED[table]
+
+
+def loaded_engine():
+    engine = VehicleSetEngine(Manager())
+    assert engine.load()
+    return engine
+
+
+def test_an_id_leaves_the_set_with_its_last_row():
+    ids = VehicleIdSet([1, 2], [2, 1])
+    ids.add([3, 1])
+    assert ids.ids.tolist() == [1, 2, 3] and ids.counts.tolist() == [3, 1, 1]
+    ids.remove([1, 1, 2, 5])
+    assert ids.ids.tolist() == [1, 3] and ids.counts.tolist() == [1, 1]
+    assert ids.bitmap.contains_many([1, 2, 3]).tolist() == [True, False, True]
+
+
+def test_set_operations():
+    engine = loaded_engine()
+    results = {operation: engine.compute(operation).tolist() for operation in engine.OPERATIONS}
+    assert results == {
+        "union": [1, 2, 3, 4],
+        "intersect": [2, 4],
+        "accidents_only": [1],
+        "violations_only": [3],
+        "symmetric_difference": [1, 3],
+    }
+    assert [tuple(row) for row in engine.result("intersect")] == [(2,), (4,)]
+
+
+def test_writes_are_applied_without_a_reload():
+    engine = loaded_engine()
+    engine.record_insert("vehicleviolation", [1, None])
+    engine.record_delete("accident", [1, 4])
+    assert engine.ready() and engine.db.queries == 2
+    # Vehicle 1 had two accidents, so one delete keeps it
+    assert engine.compute("intersect").tolist() == [1, 2]
+    accidents, violations = engine.membership([1, 4])
+    assert accidents.tolist() == [True, False] and violations.tolist() == [True, True]
+    assert engine.in_both(1) and not engine.in_both(3)
+
+
+def test_an_unparseable_vehicle_id_marks_the_engine_stale():
+    engine = loaded_engine()
+    engine.record_insert("accident", ["not an id"])
+    assert engine.ready() and engine.db.queries == 4
@@ -0,0 +1,180 @@
+import functools
+import threading
+
+import numpy as np
+from mysql.connector import Error
+
+from bitmap_index import RoaringBitmap
+from columnar import ColumnarResult
+from fast_path import Freshness, fast_path, load_unless_changed
+from row_types import make_rows
+
+# Tables whose VehicleID column the engine mirrors
+TRACKED_TABLES = ("accident", "vehicleviolation")
+
+LOAD_QUERY = "SELECT VehicleID, COUNT(*) FROM {table} WHERE VehicleID IS NOT NULL GROUP BY VehicleID ORDER BY VehicleID;"
+
+
+class VehicleIdSet:
+    """
+    Sorted unique VehicleIDs of one table, with the number of rows per ID.
+
+    The counts let a delete remove an ID only when its last row is gone.
+    Every change builds new arrays, so a reader holding the old ``ids`` array
+    never sees it change underneath it. ``bitmap`` holds the same IDs for
+    membership checks and is updated in place.
+    """
+
+    def __init__(self, ids=None, counts=None):
+        self.ids = np.asarray(ids if ids is not None else [], dtype=np.int64)
+        self.counts = np.asarray(counts if counts is not None else [], dtype=np.int64)
+        self.bitmap = RoaringBitmap.from_sorted(self.ids)
+
+    def add(self, vehicle_ids):
+        values, counts = np.unique(np.asarray(vehicle_ids, dtype=np.int64), return_counts=True)
+        positions = np.searchsorted(self.ids, values)
+        present = positions < len(self.ids)
+        present[present] = self.ids[positions[present]] == values[present]
+
+        new_counts = self.counts.copy()
+        np.add.at(new_counts, positions[present], counts[present])
+        missing = ~present
+        self.ids = np.insert(self.ids, positions[missing], values[missing])
+        self.counts = np.insert(new_counts, positions[missing], counts[missing])
+        self.bitmap.add_many(values[missing])
+
+    def remove(self, vehicle_ids):
+        values, counts = np.unique(np.asarray(vehicle_ids, dtype=np.int64), return_counts=True)
+        positions = np.searchsorted(self.ids, values)
+        present = positions < len(self.ids)
+        present[present] = self.ids[positions[present]] == values[present]
+
+        new_counts = self.counts.copy()
+        np.subtract.at(new_counts, positions[present], counts[present])
+        keep = new_counts > 0
+        self.bitmap.remove_many(self.ids[~keep])
+        self.ids = self.ids[keep]
+        self.counts = new_counts[keep]
+
+
+class VehicleSetEngine:
+    """
+    In-memory answers for the VehicleID set queries over accident and vehicleviolation.
+
+    Both tables are loaded once as sorted unique VehicleID arrays; the set
+    queries then become np.union1d / np.intersect1d / np.setdiff1d /
+    np.setxor1d over those arrays instead of joins and NOT IN subqueries.
+    The same IDs are also kept in one RoaringBitmap per table, which answers
+    set_membership lookups without a query.
+    DatabaseManager keeps the arrays current on inserts and deletes. Any
+    write it cannot apply exactly (an update of VehicleID, a cascading
+    delete) marks the engine stale and it reloads on next use. ``max_age``
+    forces a periodic reload to pick up writes made by other processes.
+    Results have set semantics: each VehicleID appears once, in ascending order.
+    """
+
+    OPERATIONS = {
+        "union": lambda a, v: np.union1d(a, v),
+        "intersect": lambda a, v: np.intersect1d(a, v, assume_unique=True),
+        "accidents_only": lambda a, v: np.setdiff1d(a, v, assume_unique=True),
+        "violations_only": lambda a, v: np.setdiff1d(v, a, assume_unique=True),
+        "symmetric_difference": lambda a, v: np.setxor1d(a, v, assume_unique=True),
+    }
+
+    def __init__(self, db, max_age=None):
+        self.db = db
+        self._sets = None  # table -> VehicleIdSet
+        self._freshness = Freshness(max_age)
+        self._lock = threading.Lock()
+
+    def load(self):
+        """(Re)load both tables' VehicleIDs. Returns True on success."""
+        try:
+            if load_unless_changed(self._freshness, self._lock, self._read, self._install):
+                return True
+        except Error as e:
+            print(f"Error loading vehicle ID sets: {e}")
+            return False
+        print("Vehicle ID sets kept changing while loading; using SQL until the next attempt.")
+        return False
+
+    def _read(self):
+        sets = {}
+        # From the primary: later writes are applied on top, so a lagging replica would lose them
+        with self.db.reading_from_primary():
+            for table in TRACKED_TABLES:
+                rows = self.db.run_query(LOAD_QUERY.format(table=table))
+                ids = [row[0] for row in rows]
+                counts = [row[1] for row in rows]
+                sets[table] = VehicleIdSet(ids, counts)
+        return sets
+
+    def _install(self, sets):
+        self._sets = sets
+
+    def ready(self):
+        """Make sure the arrays are loaded and fresh; False means fall back to SQL."""
+        return self.load() if self._freshness.due() else True
+
+    def mark_stale(self):
+        with self._lock:
+            self._freshness.mark_stale()
+
+    def record_insert(self, table, vehicle_ids):
+        self._apply(table, vehicle_ids, VehicleIdSet.add)
+
+    def record_delete(self, table, vehicle_ids):
+        self._apply(table, vehicle_ids, VehicleIdSet.remove)
+
+    def _apply(self, table, vehicle_ids, change):
+        if table not in TRACKED_TABLES:
+            return
+        try:
+            vehicle_ids = [int(vehicle_id) for vehicle_id in vehicle_ids if vehicle_id is not None]
+        except (TypeError, ValueError):
+            self.mark_stale()
+            return
+        if not vehicle_ids:
+            return
+        with self._lock:
+            self._freshness.changed()
+            if self._sets is not None and not self._freshness.stale:
+                change(self._sets[table], vehicle_ids)
+
+    def compute(self, operation):
+        """Return the sorted VehicleID array for a set operation."""
+        with self._lock:
+            accidents = self._sets["accident"].ids
+            violations = self._sets["vehicleviolation"].ids
+        return self.OPERATIONS[operation](accidents, violations)
+
+    def membership(self, vehicle_ids):
+        """Boolean arrays (has_accident, has_violation) with one entry per ID in ``vehicle_ids``."""
+        with self._lock:
+            return (self._sets["accident"].bitmap.contains_many(vehicle_ids),
+                    self._sets["vehicleviolation"].bitmap.contains_many(vehicle_ids))
+
+    def in_both(self, vehicle_id):
+        """True if ``vehicle_id`` has at least one accident and at least one violation."""
+        with self._lock:
+            return (vehicle_id in self._sets["accident"].bitmap
+                    and vehicle_id in self._sets["vehicleviolation"].bitmap)
+
+    def result(self, operation, columnar=False):
+        """Result of ``operation`` shaped like the SQL query methods' results."""
+        ids = self.compute(operation)
+        if columnar:
+            return ColumnarResult(["VehicleID"], {"VehicleID": ids})
+        return make_rows(("VehicleID",), ((vehicle_id,) for vehicle_id in ids.tolist()))
+
+
+def _set_operation_answer(operation, db, method_name, columnar=False):
+    engine = db.vehicle_sets
+    if engine is None or not engine.ready():
+        return None
+    return engine.result(operation, columnar)
+
+
+def vehicle_set_query(operation):
+    """Answer a DatabaseManager set query with ``operation`` from the VehicleSetEngine when it can."""
+    return fast_path(functools.partial(_set_operation_answer, operation))